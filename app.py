@@ -1,10 +1,14 @@
 import streamlit as st
 import os
+import mmap
 import time
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 from src.core.storage import StorageManager
+from src.core.catalog_index import CatalogIndex
 from src.core.ingest import IngestManager
-from src.core.converter import ConverterManager
 from src.core.chunker_manager import ChunkerManager
 from src.core.vector_store import VectorStoreManager
 from src.core.rag import RAGManager
@@ -24,18 +28,43 @@ from src.core.config import (
     DEFAULT_USE_MAGIC_REWRITE,
     DEFAULT_USE_RERANKER,
     DEFAULT_RERANK_TOP_N,
+    BATCH_CONVERT_WORKERS,
+    BATCH_CHUNK_WORKERS,
     CACHE_ENABLED,
     CACHE_SIMILARITY_THRESHOLD,
     DEFAULT_CACHE_MODE
 )
 
-from src.chunkers.sentence import SentenceChunker
-from src.chunkers.paragraph import ParagraphChunker
-from src.chunkers.hierarchy import HierarchyChunker
-from src.chunkers.recursive import RecursiveChunker
-from src.chunkers.semantic import SemanticChunker
 from src.ui.styles import apply_custom_styles, render_styled_sources
+from src.core import jsonio
+from src.core.cache import decode_embedding
 import json
+import re
+import pandas as pd
+
+# Single alternation pattern so highlighting makes one pass over the chunk
+# file instead of two full re.sub scans. The highlight colour is constant for
+# the session, so the replacement HTML is specialized once at import time and
+# each match only fills in the chunk id.
+_MARKER_RE = re.compile(r'<!-- chunk_id_(start|end): (.*?) -->')
+
+# Constants derived from config, built once instead of per rerun
+ALLOWED_TYPES = [ext.lstrip(".") for ext in ALLOWED_EXTENSIONS]
+CHUNKER_NAMES = ["sentence_v1", "paragraph_v1", "hierarchy_v1", "recursive_v1", "semantic_v1"]
+_CACHE_MODE_MAP = {"Only Positive": "only_positive", "Positive > Negative": "pos_gt_neg"}
+# Validated once at import so the model selectbox never seeds with a value
+# outside its options
+_DEFAULT_LLM_MODEL = DEFAULT_LLM_MODEL if DEFAULT_LLM_MODEL in AVAILABLE_LLM_MODELS else AVAILABLE_LLM_MODELS[0]
+_START_TMPL = (f'<div style="color: {CHUNK_HIGHLIGHT_COLOR}; font-weight: bold; '
+               f'border-top: 2px solid {CHUNK_HIGHLIGHT_COLOR}; '
+               'margin-top: 10px; padding-top: 5px;">[START CHUNK: %s]</div>')
+_END_TMPL = (f'<div style="color: {CHUNK_HIGHLIGHT_COLOR}; font-weight: bold; '
+             f'border-bottom: 2px dashed {CHUNK_HIGHLIGHT_COLOR}; '
+             'margin-bottom: 20px; padding-bottom: 5px;">[END CHUNK: %s]</div>')
+
+def _marker_repl(match: re.Match) -> str:
+    tmpl = _START_TMPL if match.group(1) == "start" else _END_TMPL
+    return tmpl % match.group(2)
 
 # Session State Init
 if "uploader_key" not in st.session_state:
@@ -71,41 +100,166 @@ if "cache_enabled" not in st.session_state:
 if "cache_filter" not in st.session_state:
     st.session_state.cache_filter = DEFAULT_CACHE_MODE
 if "sel_model" not in st.session_state:
-    st.session_state.sel_model = DEFAULT_LLM_MODEL
+    st.session_state.sel_model = _DEFAULT_LLM_MODEL
 if "sel_temp" not in st.session_state:
     st.session_state.sel_temp = DEFAULT_TEMPERATURE
 
-# Initialize Managers
-storage = StorageManager()
-ingest = IngestManager(storage)
-converter = ConverterManager(storage)
-chunker_mgr = ChunkerManager(storage)
-chunker_mgr.register_chunker(SentenceChunker())
-chunker_mgr.register_chunker(ParagraphChunker())
-chunker_mgr.register_chunker(HierarchyChunker())
-chunker_mgr.register_chunker(RecursiveChunker())
-chunker_mgr.register_chunker(SemanticChunker())
+# Initialize Managers once per process; reruns reuse the same graph, and the
+# heavy imports (markitdown, pymupdf, chunker stack) resolve inside the factory
+# instead of at module top on every rerun.
+@st.cache_resource
+def get_managers():
+    from src.core.converter import ConverterManager
 
-vector_mgr = VectorStoreManager(storage)
-rag_mgr = RAGManager(vector_mgr)
+    s = StorageManager()
+    idx = CatalogIndex()
+    ing = IngestManager(s, idx)
+    conv = ConverterManager(s, idx)
+    cm = ChunkerManager(s, idx)
+    # Chunker modules import on first use, not at startup
+    cm.register_lazy("sentence_v1", "src.chunkers.sentence:SentenceChunker")
+    cm.register_lazy("paragraph_v1", "src.chunkers.paragraph:ParagraphChunker")
+    cm.register_lazy("hierarchy_v1", "src.chunkers.hierarchy:HierarchyChunker")
+    cm.register_lazy("recursive_v1", "src.chunkers.recursive:RecursiveChunker")
+    cm.register_lazy("semantic_v1", "src.chunkers.semantic:SemanticChunker")
+    vm = VectorStoreManager(s)
+    rm = RAGManager(vm)
+    return s, idx, ing, conv, cm, vm, rm
 
-def render_tree(path: Path, prefix: str = "") -> str:
-    """Helper to render a filesystem tree as a string."""
-    tree = ""
-    # Get sorted list of files/dirs
-    items = sorted(list(path.iterdir()), key=lambda x: (not x.is_dir(), x.name.lower()))
-    for i, item in enumerate(items):
-        is_last = (i == len(items) - 1)
+storage, catalog_index, ingest, converter, chunker_mgr, vector_mgr, rag_mgr = get_managers()
+
+# Streamlit reruns the whole script per widget interaction, so directory
+# listings and metadata reads are cached keyed by a cheap mtime fingerprint
+# that naturally invalidates when the filesystem changes.
+def _mtime_ns(path: Path) -> int:
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return 0
+
+def _vs_mtime(cat: str) -> int:
+    return _mtime_ns(storage.root_path / cat / "_vector_stores")
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _list_categories(mtime: int) -> list[str]:
+    return storage.list_categories()
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _list_documents(cat: str, mtime: int) -> list[str]:
+    return storage.list_documents(cat)
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _doc_index(cat: str, mtime: int) -> dict[str, int]:
+    # Name-to-position map kept alongside the listing so selectbox defaults
+    # are a dict lookup instead of a per-rerun rebuild or linear scan
+    return {d: i for i, d in enumerate(_list_documents(cat, mtime))}
+
+@st.cache_data(show_spinner=False)
+def _load_metadata(cat: str, doc: str, mtime: int):
+    return storage.load_metadata(cat, doc)
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _list_collections(cat: str, mtime: int) -> list[str]:
+    return vector_mgr.list_collections(cat)
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _list_md(dir_str: str, mtime: int) -> list[str]:
+    # os.listdir returns plain names without per-entry stat or Path objects
+    return sorted(n for n in os.listdir(dir_str) if n.endswith(".md"))
+
+@st.cache_data(show_spinner=False)
+def _style_chunks(content: str) -> str:
+    # Keyed by a hash of the content itself, so switching back and forth
+    # between chunk runs re-styles each file at most once.
+    return _MARKER_RE.sub(_marker_repl, content)
+
+@st.cache_data(show_spinner=False)
+def _list_cache(version: int, cat, col) -> list[dict]:
+    # Keyed by an explicit version bumped at every cache mutation, so viewing
+    # the tab costs a dict lookup instead of a SQLite round-trip per rerun
+    return rag_mgr.cache.list_cache(category=cat, collection_name=col)
+
+def _bump_cache_version():
+    st.session_state.cache_version = st.session_state.get("cache_version", 0) + 1
+
+@st.cache_data(show_spinner=False)
+def _cache_entry(version: int, entry_id: int) -> dict | None:
+    # Full payload for one expanded row; list_cache only carries summaries
+    return rag_mgr.cache.get_cache_entry(entry_id)
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _catalog_rows(cats: tuple) -> list[dict]:
+    # Explorer rows come from one SELECT; the short TTL keeps reruns free of
+    # even that round-trip while mutations clear st.cache_data anyway.
+    return catalog_index.fetch(list(cats))
+
+@st.cache_data(show_spinner=False)
+def _ingest_summary(results: tuple) -> str:
+    # One markdown block instead of a success/error widget per file; keyed by
+    # the result tuples, so unchanged results skip the string build entirely.
+    lines = []
+    for name, success, msg in results:
+        if success:
+            lines.append(f"- ✅ **{name}** — {msg}")
+        else:
+            lines.append(f"- ❌ **{name}**: {msg}")
+    return "\n".join(lines)
+
+@st.cache_data(show_spinner=False)
+def _load_collection_meta(path_str: str, mtime: int) -> dict:
+    # Expander bodies run even while collapsed, so each rerun would otherwise
+    # re-open and re-parse every collection's metadata.json.
+    with open(path_str, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+@st.cache_data(show_spinner=False)
+def _read_md(path_str: str, mtime: int) -> str:
+    # mmap-backed read: the kernel page cache shares the bytes across reruns
+    # and the decoded string is cached until the file's mtime changes.
+    # Empty files cannot be mapped (e.g. image-only PDFs convert to 0 bytes).
+    if os.path.getsize(path_str) == 0:
+        return ""
+    with open(path_str, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return mm[:].decode("utf-8")
+
+def _iter_tree(path: Path, prefix: str = ""):
+    # scandir entries expose is_dir() from the cached dirent (no extra stat);
+    # precompute (is_file, casefolded name) once per entry so neither the sort
+    # nor the loop re-queries is_dir(). Yielding lines keeps the walk
+    # allocation-light; the single join below is linear in output size.
+    with os.scandir(path) as it:
+        entries = [(not e.is_dir(follow_symlinks=False), e.name.casefold(), e) for e in it]
+    entries.sort(key=lambda t: t[:2])
+    for i, (is_file, _, item) in enumerate(entries):
+        is_last = (i == len(entries) - 1)
         connector = "└── " if is_last else "├── "
-        tree += f"{prefix}{connector}{item.name}\n"
-        if item.is_dir():
+        yield f"{prefix}{connector}{item.name}\n"
+        if not is_file:
             extension = "    " if is_last else "│   "
-            tree += render_tree(item, prefix + extension)
-    return tree
+            yield from _iter_tree(Path(item.path), prefix + extension)
+
+
+def render_tree(path: Path, prefix: str = "") -> str:
+    """Helper to render a filesystem tree as a string."""
+    return "".join(_iter_tree(path, prefix))
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _cached_tree(path_str: str, mtime: int) -> str:
+    return render_tree(Path(path_str))
 
 st.set_page_config(page_title="RAG Manager", layout="wide")
 apply_custom_styles()
 
+# Success toasts survive the rerun via session state, so the actions above
+# no longer need to stall the script to keep their message visible.
+if "transient_success" in st.session_state:
+    st.toast(st.session_state.pop("transient_success"), icon="✅")
+# Per-document batch failures survive the rerun the same way
+for err in st.session_state.pop("transient_errors", []):
+    st.error(err)
+
 st.title("📚 RAG Manager")
 
 # Top-level Navigation with Radio for contextual sidebar support
@@ -116,7 +270,7 @@ selected_tab = st.radio("Navigation", tab_names, horizontal=True, label_visibili
 with st.sidebar:
     st.image("src/resources/sokrates.transparent.png", width="stretch")
     st.header("Storage")
-    categories = storage.list_categories()
+    categories = _list_categories(_mtime_ns(storage.root_path))
     
     selected_cat = st.selectbox("Select Catalog", ["(New Catalog)"] + categories)
     if selected_cat == "(New Catalog)":
@@ -125,6 +279,7 @@ with st.sidebar:
             if new_cat:
                 safe_cat = storage.sanitize_component(new_cat, 30)
                 (storage.root_path / safe_cat).mkdir(exist_ok=True)
+                st.cache_data.clear()
                 st.rerun()
             else:
                 st.error("Enter a name")
@@ -151,8 +306,7 @@ with st.sidebar:
         if cache_enabled:
             cache_mode = st.radio("Cache Mode", ["Only Positive", "Positive > Negative"], key="cache_filter")
             cache_threshold = st.slider("Cache Similarity Threshold", 0.65, 1.00, CACHE_SIMILARITY_THRESHOLD, step=0.01, key="cache_threshold", help="Min similarity to hit cache. 1.0 = Exact match.")
-            cache_mode_map = {"Only Positive": "only_positive", "Positive > Negative": "pos_gt_neg"}
-            filter_val = cache_mode_map[cache_mode]
+            filter_val = _CACHE_MODE_MAP[cache_mode]
         else:
             filter_val = "only_positive" # not used but needs to be defined
             cache_threshold = 1.0
@@ -197,10 +351,9 @@ if selected_tab == "🚀 Pipeline":
         # Upload
         with st.expander("⬆️ Upload Document"):
             max_mb = st.config.get_option("server.maxUploadSize")
-            allowed_types = [ext.replace(".", "") for ext in ALLOWED_EXTENSIONS]
             uploaded_files = st.file_uploader(
                 f"Choose files (max {max_mb}MB each)", 
-                type=allowed_types, 
+                type=ALLOWED_TYPES, 
                 accept_multiple_files=True,
                 key=f"uploader_{st.session_state.uploader_key}"
             )
@@ -213,58 +366,70 @@ if selected_tab == "🚀 Pipeline":
                 if st.button("Ingest Files"):
                     st.session_state.ingest_results = []
                     any_exists = False
-                    for up_file in uploaded_files:
-                        content = up_file.getvalue()
-                        success, msg = ingest.process_upload(category, up_file.name, content)
-                        
+                    # Stream the uploads straight to disk via one batched call
+                    # so copies overlap instead of serializing per file.
+                    batch = [(up_file.name, up_file) for up_file in uploaded_files]
+                    ingest_bar = st.progress(0)
+                    batch_results = ingest.process_batch(
+                        category, batch,
+                        progress_callback=lambda done, total: ingest_bar.progress(done / total)
+                    )
+                    for name, success, msg in batch_results:
                         if success:
-                            st.session_state.last_uploaded_doc = Path(up_file.name).stem
+                            st.session_state.last_uploaded_doc = Path(name).stem
                         if not success and msg.startswith("EXISTS:"):
                             any_exists = True
-                        
+
                         st.session_state.ingest_results.append({
-                            "name": up_file.name,
-                            "content": content,
+                            "name": name,
                             "success": success,
                             "msg": msg
                         })
                     
                     if not any_exists:
-                        time.sleep(1)
+                        st.cache_data.clear()
                         st.session_state.uploader_key += 1
                         st.rerun()
 
                 if "ingest_results" in st.session_state:
+                    uploads_by_name = {f.name: f for f in uploaded_files}
+                    static_results = []
                     for res in st.session_state.ingest_results:
                         if not res["success"] and res["msg"].startswith("EXISTS:"):
                             doc_name = res["msg"].split(":")[1]
                             st.warning(f"Document '{doc_name}' already exists in this catalog.")
-                            if st.button(f"Update & Archive '{doc_name}'", key=f"upd_{doc_name}"):
+                            if st.button(f"Update & Archive '{doc_name}'", key=f"upd_{doc_name}") and res["name"] in uploads_by_name:
                                 with st.spinner("Updating..."):
-                                    up_success, up_msg = ingest.update_document(category, res["name"], res["content"], target_doc_name=doc_name)
+                                    up_success, up_msg = ingest.update_document(category, res["name"], uploads_by_name[res["name"]], target_doc_name=doc_name)
                                     if up_success:
                                         st.success(up_msg)
                                         # Set as last uploaded for selection
                                         st.session_state.last_uploaded_doc = Path(res["name"]).stem
-                                        # Clear results and reset uploader
+                                        # Drop the resolved entry so session state
+                                        # doesn't accumulate stale results, then
+                                        # reset the uploader
+                                        st.session_state.ingest_results = [
+                                            r for r in st.session_state.ingest_results
+                                            if r["name"] != res["name"]
+                                        ]
                                         st.session_state.uploader_key += 1
                                         st.rerun()
                                     else:
                                         st.error(up_msg)
-                        elif res["success"]:
-                            st.success(f"Done: {res['name']} - {res['msg']}")
                         else:
-                            st.error(f"Error {res['name']}: {res['msg']}")
+                            static_results.append((res["name"], res["success"], res["msg"]))
+                    if static_results:
+                        # EXISTS entries keep their live buttons above; the rest
+                        # render as one cached markdown block.
+                        st.markdown(_ingest_summary(tuple(static_results)))
 
         # Document List
-        docs = storage.list_documents(category)
-        allowed_types = [ext.replace(".", "") for ext in ALLOWED_EXTENSIONS]
+        docs = _list_documents(category, _mtime_ns(storage.root_path / category))
         
         if docs:
-            # Determine index for newly uploaded doc
-            default_idx = 0
-            if "last_uploaded_doc" in st.session_state and st.session_state.last_uploaded_doc in docs:
-                default_idx = docs.index(st.session_state.last_uploaded_doc)
+            # Determine index for newly uploaded doc via O(1) hash lookup
+            doc_index = _doc_index(category, _mtime_ns(storage.root_path / category))
+            default_idx = doc_index.get(st.session_state.get("last_uploaded_doc"), 0)
 
             col_doc_sel, col_doc_upd, col_doc_ret, col_doc_del = st.columns([3, 1, 1, 1], vertical_alignment="bottom")
             with col_doc_sel:
@@ -274,11 +439,11 @@ if selected_tab == "🚀 Pipeline":
                 with st.popover("🔄 Update", width="stretch"):
                     st.write(f"Replace **{selected_doc}**")
                     st.info("Current version will be archived.")
-                    new_ver_file = st.file_uploader("Upload new version", type=allowed_types, key="new_ver_up")
+                    new_ver_file = st.file_uploader("Upload new version", type=ALLOWED_TYPES, key="new_ver_up")
                     if new_ver_file:
                         if st.button("Confirm Update", width="stretch", type="primary"):
                             with st.spinner("Updating..."):
-                                success, msg = ingest.update_document(category, new_ver_file.name, new_ver_file.getvalue(), target_doc_name=selected_doc)
+                                success, msg = ingest.update_document(category, new_ver_file.name, new_ver_file, target_doc_name=selected_doc)
                                 if success:
                                     st.session_state.last_uploaded_doc = Path(new_ver_file.name).stem
                                     st.success(msg)
@@ -305,10 +470,12 @@ if selected_tab == "🚀 Pipeline":
             with col_doc_del:
                 if st.button("🗑️ Delete", type="secondary", width="stretch"):
                     storage.delete_document(category, selected_doc)
+                    catalog_index.remove_document(category, selected_doc)
+                    st.cache_data.clear()
                     st.rerun()
             
             if selected_doc:
-                metadata = storage.load_metadata(category, selected_doc)
+                metadata = _load_metadata(category, selected_doc, _mtime_ns(storage.get_metadata_path(category, selected_doc)))
                 
                 col1, col2 = st.columns([1, 1])
                 
@@ -321,10 +488,15 @@ if selected_tab == "🚀 Pipeline":
                     st.write("⚙️ Markdown Conversion")
                     tool = st.radio('Select a conversion tool:', options=["markitdown", "pymupdf4llm"], horizontal=True)
                     if st.button("Convert to Markdown"):
+                        hits_before, misses_before = converter.cache_hits, converter.cache_misses
                         with st.spinner("Converting..."):
                             success, msg = converter.convert_to_markdown(category, selected_doc, tool)
                             if success: st.success(msg)
                             else: st.error(msg)
+                        # The converter is a per-process singleton now, so track deltas
+                        st.session_state.conv_cache_hits = st.session_state.get("conv_cache_hits", 0) + (converter.cache_hits - hits_before)
+                        st.session_state.conv_cache_misses = st.session_state.get("conv_cache_misses", 0) + (converter.cache_misses - misses_before)
+                        st.caption(f"Conversion cache this session: {st.session_state.conv_cache_hits} hits / {st.session_state.conv_cache_misses} misses")
                     
                     # Chunking Section
                     st.write("---")
@@ -333,10 +505,10 @@ if selected_tab == "🚀 Pipeline":
                     # List available conversions for chunking
                     converted_dir = storage.get_document_dir(category, selected_doc) / "converted"
                     if converted_dir.exists():
-                        conv_files = [f.name for f in converted_dir.glob("*.md")]
+                        conv_files = _list_md(str(converted_dir), _mtime_ns(converted_dir))
                         if conv_files:
                             selected_conv_to_chunk = st.selectbox("Select Conversion for Chunking", conv_files)
-                            chunker_type = st.selectbox("Select Chunker", ["sentence_v1", "paragraph_v1", "hierarchy_v1", "recursive_v1", "semantic_v1"])
+                            chunker_type = st.selectbox("Select Chunker", CHUNKER_NAMES)
                             
                             config = {}
                             if chunker_type == "sentence_v1":
@@ -374,7 +546,7 @@ if selected_tab == "🚀 Pipeline":
                     with tab2:
                         converted_dir = storage.get_document_dir(category, selected_doc) / "converted"
                         if converted_dir.exists():
-                            conv_files = [f.name for f in converted_dir.glob("*.md")]
+                            conv_files = _list_md(str(converted_dir), _mtime_ns(converted_dir))
                             if conv_files:
                                 c1, c2 = st.columns([3, 1], vertical_alignment="bottom")
                                 with c1:
@@ -382,10 +554,18 @@ if selected_tab == "🚀 Pipeline":
                                 with c2:
                                     if st.button("🗑️ Delete", key="del_conv", width="stretch"):
                                         storage.delete_file(converted_dir / selected_conv_preview)
+                                        # The deleted filename is known, so prune the
+                                        # conversion record directly instead of rescanning
+                                        metadata = storage.load_metadata(category, selected_doc)
+                                        if metadata and (metadata.get("conversion") or {}).get("filename") == selected_conv_preview:
+                                            metadata["conversion"] = None
+                                            metadata["converted_at"] = None
+                                            storage.save_metadata(category, selected_doc, metadata)
+                                        catalog_index.refresh_document(storage, category, selected_doc)
                                         st.rerun()
                                 
-                                with open(converted_dir / selected_conv_preview, "r", encoding="utf-8") as f:
-                                    st.markdown(f.read())
+                                conv_path = converted_dir / selected_conv_preview
+                                st.markdown(_read_md(str(conv_path), _mtime_ns(conv_path)))
                             else:
                                 st.warning("No converted files found.")
                         else:
@@ -395,45 +575,32 @@ if selected_tab == "🚀 Pipeline":
                     with tab3:
                         chunked_dir = storage.get_document_dir(category, selected_doc) / "chunked"
                         if chunked_dir.exists():
-                            chunk_files = list(chunked_dir.glob("*.md"))
+                            chunk_files = _list_md(str(chunked_dir), _mtime_ns(chunked_dir))
                             if chunk_files:
                                 # Settings for preview
                                 st.write("#### Preview Settings")
-                                highlight_color = CHUNK_HIGHLIGHT_COLOR
-                                
+
                                 c1, c2 = st.columns([3, 1], vertical_alignment="bottom")
                                 with c1:
-                                    selected_chunk_file = st.selectbox("View Chunk Run", [f.name for f in chunk_files])
+                                    selected_chunk_file = st.selectbox("View Chunk Run", chunk_files)
                                 with c2:
                                     if st.button("🗑️ Delete", key="del_chunk", width="stretch"):
                                         storage.delete_file(chunked_dir / selected_chunk_file)
-                                        # Sync metadata after deletion
+                                        # Only one known file was removed, so prune its
+                                        # metadata entry directly instead of re-globbing
                                         metadata = storage.load_metadata(category, selected_doc)
                                         if metadata:
-                                            existing_files = {f.name for f in chunked_dir.glob("*.md")}
-                                            metadata["chunking"] = [e for e in metadata.get("chunking", []) if e.get("filename") in existing_files]
+                                            metadata["chunking"] = [e for e in metadata.get("chunking", []) if e.get("filename") != selected_chunk_file]
                                             storage.save_metadata(category, selected_doc, metadata)
+                                        catalog_index.refresh_document(storage, category, selected_doc)
                                         st.rerun()
 
-                                with open(chunked_dir / selected_chunk_file, "r", encoding="utf-8") as f:
-                                    content = f.read()
-                                    
-                                # Highlighting logic
-                                import re
-                                styled_content = content
-                                # Replace start marker
-                                styled_content = re.sub(
-                                    r'<!-- chunk_id_start: (.*?) -->', 
-                                    f'<div style="color: {highlight_color}; font-weight: bold; border-top: 2px solid {highlight_color}; margin-top: 10px; padding-top: 5px;">[START CHUNK: \\1]</div>', 
-                                    styled_content
-                                )
-                                # Replace end marker
-                                styled_content = re.sub(
-                                    r'<!-- chunk_id_end: (.*?) -->', 
-                                    f'<div style="color: {highlight_color}; font-weight: bold; border-bottom: 2px dashed {highlight_color}; margin-bottom: 20px; padding-bottom: 5px;">[END CHUNK: \\1]</div>', 
-                                    styled_content
-                                )
-                                
+                                chunk_path = chunked_dir / selected_chunk_file
+                                content = _read_md(str(chunk_path), _mtime_ns(chunk_path))
+
+                                # Highlighting logic: one cached pass over the content
+                                styled_content = _style_chunks(content)
+
                                 st.markdown(styled_content, unsafe_allow_html=True)
                             else:
                                 st.warning("No chunk runs found.")
@@ -457,23 +624,38 @@ elif selected_tab == "⚙️ Batch Process":
             st.write("#### 📝 Batch Markdown Conversion")
             b_tool = st.radio('Conversion tool:', options=["markitdown", "pymupdf4llm"], horizontal=True, key="batch_conv_tool")
             if st.button("🚀 Convert All to Markdown", width="stretch"):
-                docs = storage.list_documents(category)
+                docs = _list_documents(category, _mtime_ns(storage.root_path / category))
                 if not docs:
                     st.warning("No documents to convert.")
                 else:
+                    from src.core.converter import convert_document_task
+
                     progress_bar = st.progress(0)
-                    for i, d in enumerate(docs):
-                        with st.spinner(f"Converting {d}..."):
-                            success, msg = converter.convert_to_markdown(category, d, b_tool)
-                        progress_bar.progress((i + 1) / len(docs))
-                    
-                    st.success(f"Batch conversion completed for {len(docs)} documents.")
-                    time.sleep(1)
+                    with st.spinner(f"Converting {len(docs)} documents..."):
+                        # Conversion is CPU-bound per document and independent across
+                        # documents, so fan out to a process pool.
+                        with ProcessPoolExecutor(max_workers=BATCH_CONVERT_WORKERS) as ex:
+                            futures = {ex.submit(convert_document_task, category, d, b_tool): d for d in docs}
+                            # Throttle progress flushes: every update is a
+                            # websocket round-trip, so only push ~4 per second
+                            last_flush = time.monotonic()
+                            conv_failures = []
+                            for i, fut in enumerate(as_completed(futures)):
+                                success, msg = fut.result()
+                                if not success:
+                                    conv_failures.append(f"{futures[fut]}: {msg}")
+                                now = time.monotonic()
+                                if now - last_flush > 0.25 or i == len(docs) - 1:
+                                    progress_bar.progress((i + 1) / len(docs))
+                                    last_flush = now
+
+                    st.session_state.transient_errors = conv_failures
+                    st.session_state.transient_success = f"Batch conversion completed for {len(docs)} documents."
                     st.rerun()
 
         with col_b2:
             st.write("#### ✂️ Batch Chunking")
-            b_chunker_type = st.selectbox("Chunker:", ["sentence_v1", "paragraph_v1", "hierarchy_v1", "recursive_v1", "semantic_v1"], key="batch_chunk_type")
+            b_chunker_type = st.selectbox("Chunker:", CHUNKER_NAMES, key="batch_chunk_type")
             
             b_config = {}
             if b_chunker_type == "sentence_v1":
@@ -492,26 +674,91 @@ elif selected_tab == "⚙️ Batch Process":
                 b_config["threshold_percentile"] = st.number_input("Split Threshold (Percentile)", 50, 99, DEFAULT_SEMANTIC_THRESHOLD_PERCENTILE, key="b_sem_thresh")
             
             if st.button("🚀 Chunk All Conversions", width="stretch"):
-                docs = storage.list_documents(category)
-                count = 0
+                docs = _list_documents(category, _mtime_ns(storage.root_path / category))
                 if not docs:
                     st.warning("No documents to chunk.")
                 else:
                     progress_bar = st.progress(0)
-                    for i, d in enumerate(docs):
-                        # Find most recent/any conversion
-                        conv_dir = storage.get_document_dir(category, d) / "converted"
-                        if conv_dir.exists():
-                            conv_files = sorted(list(conv_dir.glob("*.md")), reverse=True)
+                    if b_chunker_type == "semantic_v1":
+                        # The semantic chunker embeds sentences from every
+                        # document in one batched pass over a shared
+                        # connection, so run it through the manager directly.
+                        jobs = []
+                        failures = []
+                        for d in docs:
+                            conv_dir = storage.get_document_dir(category, d) / "converted"
+                            conv_files = _list_md(str(conv_dir), _mtime_ns(conv_dir)) if conv_dir.exists() else []
                             if conv_files:
-                                selected_conv = conv_files[0].name
-                                with st.spinner(f"Chunking {d} ({selected_conv})..."):
-                                    success, msg = chunker_mgr.run_chunking(category, d, selected_conv, b_chunker_type, b_config)
-                                    if success: count += 1
-                        progress_bar.progress((i + 1) / len(docs))
-                    
-                    st.success(f"Batch chunking completed. Processed {count} documents.")
-                    time.sleep(1)
+                                jobs.append((d, conv_files[-1]))
+                            else:
+                                failures.append((d, "No conversion found."))
+                        count = 0
+                        if jobs:
+                            with st.spinner(f"Chunking {len(jobs)} documents..."):
+                                batch_results = chunker_mgr.batch_run_chunking(
+                                    category, jobs, b_chunker_type, b_config,
+                                    progress_callback=lambda done, total: progress_bar.progress(done / total)
+                                )
+                            count = sum(1 for _, ok, _ in batch_results if ok)
+                            failures += [(d, msg) for d, ok, msg in batch_results if not ok]
+                    else:
+                        # Two-stage pipeline: a producer thread discovers conversions
+                        # while consumer workers chunk them, coordinated via a bounded
+                        # queue so neither stage stalls the other.
+                        work_q = queue.Queue(maxsize=2 * BATCH_CHUNK_WORKERS)
+                        result_q = queue.Queue()
+
+                        def _produce_chunk_jobs():
+                            for d in docs:
+                                conv_dir = storage.get_document_dir(category, d) / "converted"
+                                # Plain listdir here: this runs off the script thread,
+                                # where Streamlit's cache is unavailable.
+                                conv_files = sorted(
+                                    (n for n in os.listdir(conv_dir) if n.endswith(".md")),
+                                    reverse=True,
+                                ) if conv_dir.exists() else []
+                                if conv_files:
+                                    work_q.put((d, conv_files[0]))
+                                else:
+                                    result_q.put((d, False, "No conversion found."))
+                            for _ in range(BATCH_CHUNK_WORKERS):
+                                work_q.put(None)
+
+                        def _consume_chunk_jobs():
+                            while True:
+                                item = work_q.get()
+                                if item is None:
+                                    break
+                                d, conv_name = item
+                                success, msg = chunker_mgr.run_chunking(category, d, conv_name, b_chunker_type, b_config)
+                                result_q.put((d, success, msg))
+
+                        workers = [threading.Thread(target=_produce_chunk_jobs, daemon=True)]
+                        workers += [threading.Thread(target=_consume_chunk_jobs, daemon=True) for _ in range(BATCH_CHUNK_WORKERS)]
+                        for w in workers:
+                            w.start()
+
+                        count = 0
+                        with st.spinner(f"Chunking {len(docs)} documents..."):
+                            # Progress is driven from the main thread off the result
+                            # queue, throttled so UI flushes stay off the critical path
+                            last_flush = time.monotonic()
+                            failures = []
+                            for i in range(len(docs)):
+                                d, success, msg = result_q.get()
+                                if success:
+                                    count += 1
+                                else:
+                                    failures.append((d, msg))
+                                now = time.monotonic()
+                                if now - last_flush > 0.25 or i == len(docs) - 1:
+                                    progress_bar.progress((i + 1) / len(docs))
+                                    last_flush = now
+                        for w in workers:
+                            w.join()
+
+                    st.session_state.transient_errors = [f"{d}: {msg}" for d, msg in failures]
+                    st.session_state.transient_success = f"Batch chunking completed. Processed {count} documents."
                     st.rerun()
     else:
         st.info("Select a catalog in the sidebar to use batch processing.")
@@ -529,19 +776,28 @@ elif selected_tab == "📦 Vector Storage":
             new_col_name = st.text_input("Collection Name", placeholder="e.g. documentation_v1")
             
             # Select which chunks to include
-            docs = storage.list_documents(category)
-            selected_chunks_to_include = []
-            
+            docs = _list_documents(category, _mtime_ns(storage.root_path / category))
+
             st.write("**Select Chunks to Index:**")
+            # One widget for the whole catalog instead of a multiselect per
+            # document; widget count is what scales Streamlit's rerun cost.
+            all_options = []
+            default_options = []
             for d in docs:
                 chunk_dir = storage.get_document_dir(category, d) / "chunked"
                 if chunk_dir.exists():
-                    chunk_files = [f.name for f in chunk_dir.glob("*.md")]
+                    chunk_files = _list_md(str(chunk_dir), _mtime_ns(chunk_dir))
                     if chunk_files:
-                        # Pre-select the first one by default to speed up UI
-                        selected = st.multiselect(f"Chunks for {d}:", chunk_files, default=[chunk_files[0]], key=f"v_sel_{d}")
-                        for s in selected:
-                            selected_chunks_to_include.append((d, s))
+                        all_options += [(d, n) for n in chunk_files]
+                        # Pre-select the first one per doc to speed up UI
+                        default_options.append((d, chunk_files[0]))
+            selected_chunks_to_include = st.multiselect(
+                "Chunks to index",
+                all_options,
+                default=default_options,
+                format_func=lambda t: f"{t[0]} / {t[1]}",
+                key="v_sel_chunks",
+            )
             
             enrich_enabled = st.checkbox("Enrich chunks (LLM summary + tags)", value=False)
             v_model = st.text_input("Embedding Model", DEFAULT_EMBEDDING_MODEL, key="v_model")
@@ -556,9 +812,11 @@ elif selected_tab == "📦 Vector Storage":
                     status_text = st.empty()
                     
                     def update_progress(current, total):
-                        percent = current / total
-                        progress_bar.progress(percent)
-                        status_text.text(f"Enriching chunk {current} of {total}...")
+                        # At most ~100 UI flushes per run; enrichment calls this
+                        # once per chunk, which can be thousands of times
+                        if current % max(1, total // 100) == 0 or current == total:
+                            progress_bar.progress(current / total)
+                            status_text.text(f"Enriching chunk {current} of {total}...")
 
                     with st.spinner("Generating embeddings and creating index... (this may take a while)"):
                         success, msg = vector_mgr.create_collection(
@@ -577,16 +835,16 @@ elif selected_tab == "📦 Vector Storage":
                             
         with v_col2:
             st.write("#### 📋 Existing Collections")
-            collections = vector_mgr.list_collections(category)
+            collections = _list_collections(category, _vs_mtime(category))
             
             if collections:
                 for col in collections:
                     with st.expander(f"📦 {col}"):
                         col_path = storage.root_path / category / "_vector_stores" / col
                         meta_path = col_path / "metadata.json"
-                        if meta_path.exists():
-                            with open(meta_path, "r", encoding="utf-8") as f:
-                                meta = json.load(f)
+                        meta_mtime = _mtime_ns(meta_path)
+                        if meta_mtime:
+                            meta = _load_collection_meta(str(meta_path), meta_mtime)
                             st.write(f"**Model:** `{meta['model']}`")
                             st.write(f"**Chunks:** {meta['num_chunks']}")
                             st.write(f"**Created:** {meta['created_at']}")
@@ -610,12 +868,12 @@ elif selected_tab == "📂 Cached Sets":
     # Filtering UI
     filter_col1, filter_col2 = st.columns(2)
     with filter_col1:
-        f_categories = storage.list_categories()
+        f_categories = _list_categories(_mtime_ns(storage.root_path))
         sel_f_cat = st.selectbox("Filter by Catalog", ["All"] + f_categories, key="f_cat_sel")
     
     with filter_col2:
         if sel_f_cat != "All":
-            f_collections = vector_mgr.list_collections(sel_f_cat)
+            f_collections = _list_collections(sel_f_cat, _vs_mtime(sel_f_cat))
             sel_f_col = st.selectbox("Filter by Collection", ["All"] + f_collections, key="f_col_sel")
         else:
             sel_f_col = "All"
@@ -624,7 +882,7 @@ elif selected_tab == "📂 Cached Sets":
     # Fetch data based on filters
     query_cat = sel_f_cat if sel_f_cat != "All" else None
     query_col = sel_f_col if sel_f_col != "All" else None
-    cached_data = rag_mgr.cache.list_cache(category=query_cat, collection_name=query_col)
+    cached_data = _list_cache(st.session_state.get("cache_version", 0), query_cat, query_col)
     
     if not cached_data:
         st.info("No interactions recorded in cache yet.")
@@ -636,6 +894,7 @@ elif selected_tab == "📂 Cached Sets":
                 st.warning("Are you sure? This will delete ALL cached entries forever!")
                 if st.button("Confirm Purge", type="primary", width="stretch"):
                     rag_mgr.cache.purge_all()
+                    _bump_cache_version()
                     st.success("Cache purged.")
                     st.rerun()
 
@@ -650,59 +909,67 @@ elif selected_tab == "📂 Cached Sets":
             status_text = f":{score_color}[{row['thumbs_up']} 👍 / {row['thumbs_down']} 👎] | :blue[{hits} 🎯]"
             
             with st.expander(f"{status_text} [{row['created_at']}] {row['query'][:60]}..."):
+                # Heavy payload fields come from a separate per-row fetch;
+                # fall back to the summary if the entry vanished mid-rerun
+                entry = _cache_entry(st.session_state.get("cache_version", 0), row['id']) or row
                 st.write(f"**Category:** {row['category']} | **Collection:** {row['collection_name']} | **Model:** `{row.get('model_name', 'N/A')}`")
-                
+
                 # Logic Flags Display
                 flags = []
-                if row.get('rewritten_query'): flags.append("✨ Magic Rewrite")
-                if row.get('rerank_used'): flags.append("🎯 Reranked")
+                if entry.get('rewritten_query'): flags.append("✨ Magic Rewrite")
+                if entry.get('rerank_used'): flags.append("🎯 Reranked")
                 if flags:
                     st.write(" | ".join([f":blue[{f}]" for f in flags]))
 
                 st.write("**Original Query:**")
                 st.write(row['query'])
-                
-                if row.get('rewritten_query'):
+
+                if entry.get('rewritten_query'):
                     st.write("**Rewritten Query (Magic):**")
-                    st.info(row['rewritten_query'])
+                    st.info(entry['rewritten_query'])
 
                 st.write("**Answer:**")
-                st.write(row['answer'])
-                
+                st.write(entry.get('answer', ''))
+
                 st.write("**Sources (Used in Answer):**")
                 try:
-                    sources = json.loads(row['sources'])
+                    sources = jsonio.loads(entry['sources'])
                     render_styled_sources(sources, name="🔍 View Used Chunks")
                 except:
                     st.error("Error loading sources.")
 
-                if row.get('plausible_sources'):
+                if entry.get('plausible_sources'):
                     try:
-                        p_sources = json.loads(row['plausible_sources'])
+                        p_sources = jsonio.loads(entry['plausible_sources'])
                         render_styled_sources(p_sources, name="🔍 View Plausible Chunks (Pre-Rerank)")
                     except:
                         st.error("Error loading plausible sources.")
-                
+
                 with st.expander("🛠️ Metadata & Prompt"):
-                    st.code(f"State Hash: {row['state_hash']}", language=None)
-                    
+                    st.code(f"State Hash: {entry.get('state_hash', 'N/A')}", language=None)
+
                     st.write("**Main RAG System Prompt:**")
-                    st.code(row['prompt_content'], language="markdown")
-                    
-                    if row.get('rewrite_prompt'):
+                    st.code(entry.get('prompt_content', ''), language="markdown")
+
+                    if entry.get('rewrite_prompt'):
                         st.write("**Magic Rewrite Prompt:**")
-                        st.code(row['rewrite_prompt'], language="markdown")
-                        
-                    if row.get('rerank_prompt'):
+                        st.code(entry['rewrite_prompt'], language="markdown")
+
+                    if entry.get('rerank_prompt'):
                         st.write("**Rerank Prompt (Bypass):**")
-                        st.code(row['rerank_prompt'], language="markdown")
-                
+                        st.code(entry['rerank_prompt'], language="markdown")
+
                 with st.expander("📊 Raw Data & Debug"):
-                    st.json(dict(row))
-                    if row.get('query_embedding'):
+                    # The raw float32 blob is not JSON-renderable; show the
+                    # decoded preview below instead
+                    st.json({k: v for k, v in entry.items() if k != 'query_embedding_blob'})
+                    if entry.get('query_embedding_blob') is not None or entry.get('query_embedding'):
                         st.write("**Query Embedding (First 5):**")
                         try:
-                            emb = json.loads(row['query_embedding'])
+                            if entry.get('query_embedding_blob') is not None:
+                                emb = decode_embedding(entry['query_embedding_blob'])
+                            else:
+                                emb = jsonio.loads(entry['query_embedding'])
                             st.write(emb[:5])
                         except:
                             st.write("N/A")
@@ -710,6 +977,7 @@ elif selected_tab == "📂 Cached Sets":
                 # Delete button
                 if st.button(f"🗑️ Delete Entry", key=f"del_cache_{row['id']}"):
                     rag_mgr.cache.delete_cache_entry(row['id'])
+                    _bump_cache_version()
                     st.success("Entry deleted.")
                     st.rerun()
 
@@ -723,48 +991,42 @@ elif selected_tab == "📁 Global Explorer":
     
     st.markdown("---")
     
-    all_data = []
-    
+    # Rows grouped by catalog as they are read, so display never refilters
+    cat_groups = {}
+
     # Determine categories to show
     if scope == "Selected Catalog" and category:
         categories_to_show = [category]
     else:
-        categories_to_show = storage.list_categories()
+        categories_to_show = _list_categories(_mtime_ns(storage.root_path))
     
-    for cat in categories_to_show:
-        docs = storage.list_documents(cat)
-        for doc in docs:
-            doc_dir = storage.get_document_dir(cat, doc)
-            metadata = storage.load_metadata(cat, doc)
-            
-            # Check Converted
-            conv_dir = doc_dir / "converted"
-            conv_files = []
-            if conv_dir.exists():
-                conv_files = [f.name for f in conv_dir.glob("*.md")]
-            
-            # Check Chunked
-            chunk_dir = doc_dir / "chunked"
-            chunk_files = []
-            if chunk_dir.exists():
-                chunk_files = [f.name for f in chunk_dir.glob("*.md")]
-            
-            all_data.append({
-                "Catalog": cat,
-                "Document": doc,
-                "Size (MB)": metadata.get("file_size_mb", 0) if metadata else 0,
-                "Converted": "✅" if conv_files else "❌",
-                "Conv Files": ", ".join(conv_files),
-                "Chunked": "✅" if chunk_files else "❌",
-                "Chunk Files": ", ".join(chunk_files),
-                "Created": metadata.get("created_at", "N/A") if metadata else "N/A"
-            })
-
-    if all_data:
+    # One cached SELECT against the catalog index instead of walking the data root
+    rows = _catalog_rows(tuple(categories_to_show))
+    if not rows and any(_list_documents(c, _mtime_ns(storage.root_path / c)) for c in categories_to_show):
+        # Index not seeded yet (e.g. data predates catalog.db) - rescan once
+        catalog_index.rebuild(storage)
+        _catalog_rows.clear()
+        rows = _catalog_rows(tuple(categories_to_show))
+    for row in rows:
+        cat_groups.setdefault(row["catalog"], []).append({
+            "Document": row["name"],
+            "Size (MB)": row["size_mb"] if row["size_mb"] is not None else 0,
+            "Converted": "✅" if row["conv_files"] else "❌",
+            "Conv Files": ", ".join(row["conv_files"]),
+            "Chunked": "✅" if row["chunk_files"] else "❌",
+            "Chunk Files": ", ".join(row["chunk_files"]),
+            "Created": row["created_at"] or "N/A"
+        })
+
+    if cat_groups:
+        # One Arrow-backed dataframe per catalog instead of an expander with
+        # nested columns per document, keeping the widget count constant.
         for cat in categories_to_show:
+            docs = cat_groups.get(cat)
+            if not docs:
+                continue
             st.markdown(f"#### 📂 Catalog: {cat}")
-            docs = [d for d in all_data if d['Catalog'] == cat]
-            
+
             # Action per Cat
             c1, c2 = st.columns([4, 1])
             with c2:
@@ -772,39 +1034,33 @@ elif selected_tab == "📁 Global Explorer":
                     st.warning(f"Delete EVERYTHING in '{cat}'?")
                     if st.button("Confirm Delete Catalog", key=f"del_cat_glob_{cat}", type="primary", width="stretch"):
                         storage.delete_category(cat)
+                        catalog_index.remove_category(cat)
+                        st.cache_data.clear()
                         st.rerun()
 
-            for doc in docs:
-                status_icons = f"{doc['Converted']} MD | {doc['Chunked']} CH"
-                with st.expander(f"{status_icons} 📄 {doc['Document']}"):
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        st.write("**Metadata**")
-                        st.write(f"- Size: {doc['Size (MB)']} MB")
-                        st.write(f"- Created: {doc['Created']}")
-                        
-                        if st.button("🗑️ Delete Document", key=f"del_doc_glob_{cat}_{doc['Document']}", type="secondary"):
-                            storage.delete_document(cat, doc['Document'])
-                            st.rerun()
-                            
-                    with col2:
-                        st.write("**Generated Files**")
-                        if doc['Conv Files']:
-                            st.write(f"- 📝 Markdown: `{doc['Conv Files']}`")
-                        else:
-                            st.write("- 📝 Markdown: _None_")
-                        
-                        if doc['Chunk Files']:
-                            st.write(f"- ✂️ Chunks: `{doc['Chunk Files']}`")
-                        else:
-                            st.write("- ✂️ Chunks: _None_")
+            df = pd.DataFrame(docs)
+            st.dataframe(df, width="stretch", hide_index=True)
+
+            d1, d2 = st.columns([3, 1], vertical_alignment="bottom")
+            with d1:
+                doc_to_delete = st.selectbox(
+                    "Document to delete",
+                    [d["Document"] for d in docs],
+                    key=f"glob_doc_sel_{cat}"
+                )
+            with d2:
+                if st.button("🗑️ Delete Document", key=f"del_doc_glob_{cat}", type="secondary", width="stretch"):
+                    storage.delete_document(cat, doc_to_delete)
+                    catalog_index.remove_document(cat, doc_to_delete)
+                    st.cache_data.clear()
+                    st.rerun()
             st.write("---")
     else:
         st.info("No documents found in any catalog.")
 
 elif selected_tab == "💬 Chatbot":
     if category:
-        collections = vector_mgr.list_collections(category)
+        collections = _list_collections(category, _vs_mtime(category))
         if collections:
             # Top-level collection selector
             selected_col_chat = st.selectbox("Select Vector Collection", collections, key="chat_col_sel")
@@ -832,10 +1088,12 @@ elif selected_tab == "💬 Chatbot":
                             with f_col1:
                                 if st.button("👍", key=f"up_{idx}"):
                                     rag_mgr.cache.update_feedback(st.session_state.messages[idx-1]["content"], message["state_hash"], "up")
+                                    _bump_cache_version()
                                     st.toast("Głos oddany (pozytywny)!")
                             with f_col2:
                                 if st.button("👎", key=f"down_{idx}"):
                                     rag_mgr.cache.update_feedback(st.session_state.messages[idx-1]["content"], message["state_hash"], "down")
+                                    _bump_cache_version()
                                     st.toast("Głos oddany (negatywny).")
                             
                             # Use custom source renderer
@@ -863,6 +1121,11 @@ elif selected_tab == "💬 Chatbot":
                         
                         with st.spinner("Searching and thinking..."):
                             plausible_sources = []
+                            # Coalesce token renders to ~15 fps: each markdown
+                            # call is a websocket message and a browser reflow,
+                            # so rendering per token saturates both at high
+                            # token rates. The final flush below shows the rest.
+                            last_render = time.monotonic()
                             for part in rag_mgr.answer_question_stream(
                                 category, 
                                 selected_col_chat, 
@@ -887,7 +1150,10 @@ elif selected_tab == "💬 Chatbot":
                                     st.info(f"✨ **Magic Rewrite:** _{part['content']}_")
                                 elif part["type"] == "answer":
                                     full_answer += part["content"]
-                                    response_placeholder.markdown(full_answer + "▌")
+                                    now = time.monotonic()
+                                    if now - last_render >= 0.066:
+                                        response_placeholder.markdown(full_answer + "▌")
+                                        last_render = now
                                 elif part["type"] == "sources":
                                     sources = part["content"]
                                 elif part["type"] == "plausible_sources":
@@ -912,6 +1178,8 @@ elif selected_tab == "💬 Chatbot":
                             "plausible_sources": plausible_sources,
                             "state_hash": current_state_hash
                         })
+                # The stream may have written a new cache row
+                _bump_cache_version()
                 st.rerun()
             
             # Button for clearing
@@ -1,8 +1,12 @@
 from typing import List, Dict, Any
+import io
 import re
-from ..core.chunker_manager import ChunkerBase
+from ..core.chunker_manager import ChunkerBase, build_chunks
 from ..core.config import DEFAULT_CHUNKER_VERSION
 
+# Markdown header pattern, compiled once at import
+_HEADER_RE = re.compile(r'^(#{1,6})\s+(.+)$')
+
 class HierarchyChunker(ChunkerBase):
     @property
     def name(self) -> str:
@@ -21,98 +25,104 @@ class HierarchyChunker(ChunkerBase):
         """
         max_chunk_size = config.get("max_chunk_size", 2000)
         include_path = config.get("include_path", True)
-        
-        lines = text.split('\n')
-        chunks = []
-        
+
+        # Chunk contents only; ids and orders are assembled once at the end
+        contents: List[str] = []
+
         # Stack to keep track of headers: [(level, text)]
         header_stack: List[tuple[int, str]] = []
-        current_content: List[str] = []
-        
+        # Paragraphs are captured while scanning (blank line = boundary), so
+        # flushing never has to join the whole section just to split it on
+        # '\n\n' again
+        current_paragraphs: List[str] = []
+        current_para_lines: List[str] = []
+
+        def close_paragraph():
+            if current_para_lines:
+                paragraph = '\n'.join(current_para_lines).strip()
+                current_para_lines.clear()
+                if paragraph:
+                    current_paragraphs.append(paragraph)
+
         # Helper to flush current content
         def flush_chunk():
-            if not current_content:
-                return
-            
-            nonlocal chunks
-            content_text = '\n'.join(current_content).strip()
-            if not content_text:
+            close_paragraph()
+            if not current_paragraphs:
                 return
 
-            # Construct path string
-            path_str = " > ".join([h[1] for h in header_stack])
-            
-            # If content is too large, split by paragraphs
-            if len(content_text) > max_chunk_size:
-                sub_parts = content_text.split('\n\n')
+            # Construct path string; with include_path off the stack is never
+            # populated, so this stays an empty join
+            path_str = " > ".join([h[1] for h in header_stack]) if include_path else ""
+
+            # If content is too large, pack paragraphs into sub chunks
+            para_lens = [len(p) for p in current_paragraphs]
+            # Account for the '\n\n' joints when comparing against the limit
+            total_len = sum(para_lens) + 2 * (len(para_lens) - 1)
+            if total_len > max_chunk_size:
                 current_sub_chunk = []
                 current_sub_len = 0
-                
-                for part in sub_parts:
-                    part = part.strip()
-                    if not part: continue
-                    
+
+                for part, part_len in zip(current_paragraphs, para_lens):
                     # If adding this part exceeds max, flush sub chunk
-                    if current_sub_len + len(part) > max_chunk_size and current_sub_chunk:
+                    if current_sub_len + part_len > max_chunk_size and current_sub_chunk:
                         sub_content = "\n\n".join(current_sub_chunk)
-                        full_content = f"Context: {path_str}\n\n{sub_content}" if include_path and path_str else sub_content
-                        add_final_chunk(full_content)
+                        contents.append(f"Context: {path_str}\n\n{sub_content}" if path_str else sub_content)
                         current_sub_chunk = []
                         current_sub_len = 0
-                    
+
                     current_sub_chunk.append(part)
-                    current_sub_len += len(part)
-                
+                    current_sub_len += part_len
+
                 # Flush remaining sub chunk
                 if current_sub_chunk:
                     sub_content = "\n\n".join(current_sub_chunk)
-                    full_content = f"Context: {path_str}\n\n{sub_content}" if include_path and path_str else sub_content
-                    add_final_chunk(full_content)
+                    contents.append(f"Context: {path_str}\n\n{sub_content}" if path_str else sub_content)
             else:
                 # Normal chunk
-                full_content = f"Context: {path_str}\n\n{content_text}" if include_path and path_str else content_text
-                add_final_chunk(full_content)
-
-        def add_final_chunk(content: str):
-            order = len(chunks) + 1
-            chunks.append({
-                "id": f"chunk_{order:03d}",
-                "order": order,
-                "content": content
-            })
-
-        # Regex for markdown headers
-        header_pattern = re.compile(r'^(#{1,6})\s+(.+)$')
-        
-        for line in lines:
-            match = header_pattern.match(line)
+                content_text = "\n\n".join(current_paragraphs)
+                contents.append(f"Context: {path_str}\n\n{content_text}" if path_str else content_text)
+            current_paragraphs.clear()
+
+
+        # Iterate lines off a StringIO instead of materializing the full line
+        # list up-front; only the current paragraph's lines stay buffered.
+        for line in io.StringIO(text):
+            line = line.rstrip('\n')
+            # Cheap first-character check skips the regex engine entirely for
+            # the vast majority of lines, which are not headers
+            match = _HEADER_RE.match(line) if line.startswith('#') else None
             if match:
                 # We found a header
                 # 1. Flush whatever content we had before this header
                 flush_chunk()
-                current_content = []
-                
-                level = len(match.group(1))
-                header_text = match.group(2).strip()
-                
-                # 2. Update stack
-                # Remove headers of same or lower importance (higher level number = deeper)
-                # Wait, standard markdown: # is H1 (level 1), ## is H2 (level 2).
-                # If we are at level 2, and see a level 2, we pop the previous level 2.
-                # If we are at level 2, and see a level 1, we pop everything back to level 0.
-                while header_stack and header_stack[-1][0] >= level:
-                    header_stack.pop()
-                
-                header_stack.append((level, header_text))
+
+                # 2. Update stack — only worth maintaining when the path is
+                # actually prepended to the chunks; otherwise headers are pure
+                # section boundaries
+                if include_path:
+                    level = len(match.group(1))
+                    header_text = match.group(2).strip()
+
+                    # Remove headers of same or lower importance (higher level number = deeper)
+                    # Wait, standard markdown: # is H1 (level 1), ## is H2 (level 2).
+                    # If we are at level 2, and see a level 2, we pop the previous level 2.
+                    # If we are at level 2, and see a level 1, we pop everything back to level 0.
+                    while header_stack and header_stack[-1][0] >= level:
+                        header_stack.pop()
+
+                    header_stack.append((level, header_text))
+            elif line.strip():
+                current_para_lines.append(line)
             else:
-                current_content.append(line)
-                
+                # Blank line closes the paragraph being accumulated
+                close_paragraph()
+
         # Flush last section
         flush_chunk()
-        
+
         return {
-            "chunks": chunks,
+            "chunks": build_chunks(contents),
             "stats": {
-                "num_chunks": len(chunks)
+                "num_chunks": len(contents)
             }
         }
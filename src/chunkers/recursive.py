@@ -1,8 +1,18 @@
 from typing import List, Dict, Any, Optional
 import re
-from ..core.chunker_manager import ChunkerBase
+from ..core.chunker_manager import ChunkerBase, build_chunks
 from ..core.config import DEFAULT_CHUNKER_VERSION, DEFAULT_CHUNK_SIZE, DEFAULT_CHUNK_OVERLAP
 
+# Compiled patterns per separator, built lazily and reused across calls
+_SEP_PATTERNS: Dict[str, "re.Pattern"] = {}
+
+def _sep_pattern(sep: str) -> "re.Pattern":
+    pattern = _SEP_PATTERNS.get(sep)
+    if pattern is None:
+        pattern = re.compile(re.escape(sep))
+        _SEP_PATTERNS[sep] = pattern
+    return pattern
+
 class RecursiveChunker(ChunkerBase):
     @property
     def name(self) -> str:
@@ -25,21 +35,12 @@ class RecursiveChunker(ChunkerBase):
         
         # 2. Merge parts into chunks with overlap
         chunks = self._merge_splits(splits, chunk_size, chunk_overlap, separator="")
-        
+
         # 3. Format result
-        final_chunks = []
-        for i, content in enumerate(chunks):
-            order = i + 1
-            final_chunks.append({
-                "id": f"chunk_{order:03d}",
-                "order": order,
-                "content": content
-            })
-            
         return {
-            "chunks": final_chunks,
+            "chunks": build_chunks(chunks),
             "stats": {
-                "num_chunks": len(final_chunks)
+                "num_chunks": len(chunks)
             }
         }
 
@@ -50,25 +51,34 @@ class RecursiveChunker(ChunkerBase):
         final_chunks = []
         
         # Find the best separator (the one that appears and is highest priority)
+        # and split on it in the same forward scan: slicing on finditer offsets
+        # replaces the `in` probe plus str.split, which each walked the whole
+        # string once.
         separator = separators[-1] # Default to last (usually empty string)
         new_separators = []
+        splits = None
         
         for i, sep in enumerate(separators):
             if sep == "":
                 separator = sep
                 break
-            # Use regex to check existence if needed, but strict string check is faster and usually sufficient
-            # Note: LangChain uses regex escaping. We will assume simple string separators for now.
-            if sep in text:
+            pieces = []
+            start = 0
+            for m in _sep_pattern(sep).finditer(text):
+                pieces.append(text[start:m.start()])
+                start = m.end()
+            if pieces:
+                pieces.append(text[start:])
                 separator = sep
                 new_separators = separators[i+1:]
+                splits = pieces
                 break
                 
-        # Split
-        if separator:
-            splits = text.split(separator)
-        else:
-            splits = list(text) # Character split if sep is empty string
+        if splits is None:
+            if separator == "":
+                splits = list(text) # Character split if sep is empty string
+            else:
+                splits = [text]
             
         # Recover separator in splits to keep length accurate?
         # Standard approach: split loses the separator. 
@@ -99,9 +109,19 @@ class RecursiveChunker(ChunkerBase):
         """
         chunks = []
         current_chunk = []
+        # Lengths tracked alongside the splits so the overlap tail is found by
+        # index arithmetic instead of repeated list.insert(0, ...)
+        current_lens = []
         current_len = 0
-        
-        for split in splits:
+        # Hoisted out of the hot loop: the separator never changes mid-merge,
+        # and binding append locally skips an attribute lookup per flush
+        sep_len = len(separator)
+        append_chunk = chunks.append
+        # All split lengths computed in one comprehension up-front; the loop
+        # then reads them without a len() dispatch per iteration
+        lens = [len(s) for s in splits]
+
+        for split, len_split in zip(splits, lens):
             # Calculate length if we add this split
             # We assume a separator (like space) is added between splits when merging
             # If default separator logic is complex, simplify to just adding length.
@@ -115,35 +135,31 @@ class RecursiveChunker(ChunkerBase):
             # Simpler: just use space for now or let the user choose. 
             # Actually, standard RCC often assumes " " join or keeps existing whitespace.
             # Let's stick to " " for join to be safe unless we track specific separators.
-            
-            len_split = len(split)
-            
-            if current_len + len_split + len(separator) > chunk_size:
+
+            if current_len + len_split + sep_len > chunk_size:
                 # Close current chunk
                 if current_chunk:
-                    text_content = separator.join(current_chunk)
-                    chunks.append(text_content)
+                    append_chunk(separator.join(current_chunk))
                     
                     # Logic for overlap:
                     # We need to keep some tail of current_chunk for the next chunk.
-                    # We backtrack from the end of current_chunk until length is approx chunk_overlap
-                    overlap_chunk = []
+                    # Backtrack over the cached lengths until ~chunk_overlap is
+                    # covered, then keep the tail with one slice.
                     overlap_len = 0
-                    
-                    for s in reversed(current_chunk):
-                        if overlap_len + len(s) < chunk_overlap:
-                            overlap_chunk.insert(0, s)
-                            overlap_len += len(s)
-                        else:
-                            break
-                    
-                    current_chunk = overlap_chunk
+                    i = len(current_lens)
+                    while i > 0 and overlap_len + current_lens[i - 1] < chunk_overlap:
+                        overlap_len += current_lens[i - 1]
+                        i -= 1
+
+                    current_chunk = current_chunk[i:]
+                    current_lens = current_lens[i:]
                     current_len = overlap_len
-            
+
             current_chunk.append(split)
-            current_len += len_split + len(separator)
-            
+            current_lens.append(len_split)
+            current_len += len_split + sep_len
+
         if current_chunk:
-            chunks.append(separator.join(current_chunk))
+            append_chunk(separator.join(current_chunk))
             
         return chunks
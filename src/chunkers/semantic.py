@@ -1,9 +1,11 @@
 from typing import List, Dict, Any
-import re
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 from openai import OpenAI
-import httpx
-from ..core.chunker_manager import ChunkerBase
+from ..core.chunker_manager import ChunkerBase, build_chunks
+from ..core.http_pool import shared_http_client
+from .splitting import split_sentences as _split_sentences
 from ..core.config import (
     DEFAULT_CHUNKER_VERSION, 
     DEFAULT_EMBEDDING_BASE_URL, 
@@ -12,6 +14,15 @@ from ..core.config import (
     DEFAULT_SEMANTIC_THRESHOLD_PERCENTILE
 )
 
+# One client per base_url: reuses the keep-alive connection instead of a TLS
+# handshake per chunk() call
+_CLIENT_CACHE: Dict[str, OpenAI] = {}
+
+# (model, text-hash) -> embedding, so re-running the same document only embeds
+# sentences that changed. Bounded so long sessions don't grow without limit.
+_EMBED_CACHE: Dict[tuple, List[float]] = {}
+_EMBED_CACHE_MAX = 50_000
+
 class SemanticChunker(ChunkerBase):
     @property
     def name(self) -> str:
@@ -21,118 +32,133 @@ class SemanticChunker(ChunkerBase):
     def version(self) -> str:
         return DEFAULT_CHUNKER_VERSION
 
-    def chunk(self, text: str, config: Dict[str, Any]) -> Dict[str, Any]:
+    @staticmethod
+    def split_sentences(text: str) -> List[str]:
+        # Simple splitting - can be improved
+        # Split by .!? followed by space/newline
+        return _split_sentences(text)
+
+    @staticmethod
+    def embed_texts(texts: List[str], config: Dict[str, Any], client: OpenAI = None) -> List[List[float]]:
         """
-        Chunks text based on semantic similarity of sentences.
+        Embed texts in batches over one client connection. Callers batching
+        several documents can pass a shared client to reuse the keep-alive
+        connection across the whole run.
         """
         base_url = config.get("base_url", DEFAULT_EMBEDDING_BASE_URL)
         model_name = config.get("model_name", DEFAULT_EMBEDDING_MODEL)
+
+        if client is None:
+            client = _CLIENT_CACHE.get(base_url)
+            if client is None:
+                client = OpenAI(
+                    base_url=base_url,
+                    api_key=DEFAULT_EMBEDDING_API_KEY,
+                    http_client=shared_http_client()
+                )
+                _CLIENT_CACHE[base_url] = client
+
+        # Reuse embeddings for sentences seen before; only misses hit the API
+        keys = [(model_name, hashlib.sha1(t.encode("utf-8")).hexdigest()) for t in texts]
+        misses = [i for i, k in enumerate(keys) if k not in _EMBED_CACHE]
+
+        if misses:
+            batch_size = 100
+            batches = [misses[i : i + batch_size] for i in range(0, len(misses), batch_size)]
+            # The batches are independent HTTP round-trips, so a small thread
+            # pool hides the per-batch latency
+            def _embed_batch(idx_batch):
+                response = client.embeddings.create(
+                    input=[texts[i] for i in idx_batch], model=model_name
+                )
+                return [d.embedding for d in response.data]
+
+            with ThreadPoolExecutor(max_workers=min(8, len(batches))) as pool:
+                # Ensure ordered: futures are collected in submission order
+                for idx_batch, embs in zip(batches, pool.map(_embed_batch, batches)):
+                    for i, emb in zip(idx_batch, embs):
+                        _EMBED_CACHE[keys[i]] = emb
+            if len(_EMBED_CACHE) > _EMBED_CACHE_MAX:
+                # Coarse eviction: keep only the current document's sentences
+                retained = {k: _EMBED_CACHE[k] for k in keys}
+                _EMBED_CACHE.clear()
+                _EMBED_CACHE.update(retained)
+
+        return [_EMBED_CACHE[k] for k in keys]
+
+    def chunk(self, text: str, config: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Chunks text based on semantic similarity of sentences.
+        """
+        sentences = self.split_sentences(text)
+
+        if not sentences:
+            return {"chunks": [], "stats": {"num_chunks": 0}}
+
+        if len(sentences) > 1:
+            try:
+                embeddings = self.embed_texts(sentences, config)
+            except Exception as e:
+                # Fallback or error
+                # For now, return error chunk
+                return {
+                    "chunks": [{
+                        "id": "error",
+                        "order": 0,
+                        "content": f"Embedding Error: {str(e)}"
+                    }],
+                    "stats": {"num_chunks": 0}
+                }
+        else:
+            embeddings = []
+
+        return self.chunk_from_embeddings(sentences, embeddings, config)
+
+    def chunk_from_embeddings(self, sentences: List[str], sentence_embeddings: List[List[float]], config: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Group pre-split sentences using precomputed embeddings. Used directly
+        by batch runs that embed sentences from many documents in one call.
+        """
         threshold_percentile = config.get("threshold_percentile", DEFAULT_SEMANTIC_THRESHOLD_PERCENTILE)
-        
-        # 1. Split into sentences
-        # Simple splitting - can be improved
-        # Split by .!? followed by space/newline
-        raw_sentences = re.split(r'(?<=[.!?])\s+', text)
-        sentences = [{'text': s.strip(), 'index': i} for i, s in enumerate(raw_sentences) if s.strip()]
-        
+
         if not sentences:
-             return {"chunks": [], "stats": {"num_chunks": 0}}
-             
+            return {"chunks": [], "stats": {"num_chunks": 0}}
+
         if len(sentences) == 1:
             return {
-                "chunks": [{
-                    "id": "chunk_001",
-                    "order": 1,
-                    "content": sentences[0]['text']
-                }],
+                "chunks": build_chunks([sentences[0]]),
                 "stats": {"num_chunks": 1}
             }
 
-        # 2. Get embeddings
-        client = OpenAI(
-            base_url=base_url, 
-            api_key=DEFAULT_EMBEDDING_API_KEY,
-            http_client=httpx.Client(verify=False)
-        )
-        
-        try:
-            # Batch sentences for embedding
-            # Note: For very large docs, might need to chunk the embedding calls
-            batch_size = 100
-            all_embeddings = []
-            
-            texts_to_embed = [s['text'] for s in sentences]
-            
-            for i in range(0, len(texts_to_embed), batch_size):
-                batch = texts_to_embed[i : i + batch_size]
-                response = client.embeddings.create(input=batch, model=model_name)
-                # Ensure ordered
-                batch_embeddings = [d.embedding for d in response.data]
-                all_embeddings.extend(batch_embeddings)
-                
-        except Exception as e:
-            # Fallback or error
-            # For now, return error chunk
-            return {
-                "chunks": [{
-                    "id": "error", 
-                    "order": 0, 
-                    "content": f"Embedding Error: {str(e)}"
-                }],
-                "stats": {"num_chunks": 0}
-            }
+        # Calculate Cosine Distances between adjacent sentences. float32 is
+        # plenty for cosine comparisons and halves the memory traffic of the
+        # normalization and einsum below.
+        embeddings = np.asarray(sentence_embeddings, dtype=np.float32)
 
-        # 3. Calculate Cosine Distances between adjacent sentences
-        embeddings = np.array(all_embeddings)
-        
         # Normalize embeddings to strict unit length for cosine similarity
         norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
         embeddings = embeddings / norms
-        
-        distances = []
-        for i in range(len(embeddings) - 1):
-            # Cosine similarity
-            sim = np.dot(embeddings[i], embeddings[i+1])
-            # Distance = 1 - similarity
-            dist = 1 - sim
-            distances.append(dist)
-            
-        # 4. Determine Threshold
-        if not distances:
-             # Should not happen if len > 1
-             threshold = 0
-        else:
-            threshold = np.percentile(distances, threshold_percentile)
-            
-        # 5. Group sentences
-        chunks = []
-        current_chunk_sentences = [sentences[0]['text']]
-        
-        for i, dist in enumerate(distances):
-            # dist corresponds to gap between sentence[i] and sentence[i+1]
-            if dist > threshold:
-                # Breakpoint found
-                chunks.append(" ".join(current_chunk_sentences))
-                current_chunk_sentences = [sentences[i+1]['text']]
-            else:
-                current_chunk_sentences.append(sentences[i+1]['text'])
-                
-        if current_chunk_sentences:
-            chunks.append(" ".join(current_chunk_sentences))
-            
-        # 6. Format result
-        final_chunks = []
-        for i, content in enumerate(chunks):
-            order = i + 1
-            final_chunks.append({
-                "id": f"chunk_{order:03d}",
-                "order": order,
-                "content": content
-            })
-            
+
+        # One vectorized pass over all adjacent pairs instead of a NumPy
+        # dispatch per sentence gap; distances[i] covers the gap between
+        # sentence[i] and sentence[i+1]
+        distances = 1.0 - np.einsum('ij,ij->i', embeddings[:-1], embeddings[1:])
+
+        # Determine Threshold
+        threshold = np.percentile(distances, threshold_percentile)
+
+        # Group sentences: breakpoints are the gaps above the threshold, and
+        # np.split turns them into index runs we join by slice
+        breakpoints = np.flatnonzero(distances > threshold)
+        contents = [
+            " ".join(sentences[group[0] : group[-1] + 1])
+            for group in np.split(np.arange(len(sentences)), breakpoints + 1)
+            if group.size
+        ]
+
         return {
-            "chunks": final_chunks,
+            "chunks": build_chunks(contents),
             "stats": {
-                "num_chunks": len(final_chunks)
+                "num_chunks": len(contents)
             }
         }
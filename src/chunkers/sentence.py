@@ -1,8 +1,8 @@
-import re
 from typing import List, Dict, Any
-from ..core.chunker_manager import ChunkerBase
+from ..core.chunker_manager import ChunkerBase, build_chunks
 
 from ..core.config import DEFAULT_CHUNKER_VERSION, DEFAULT_SENTENCES_PER_CHUNK
+from .splitting import iter_sentences
 
 class SentenceChunker(ChunkerBase):
     @property
@@ -17,24 +17,21 @@ class SentenceChunker(ChunkerBase):
         sentences_per_chunk = config.get("sentences_per_chunk", DEFAULT_SENTENCES_PER_CHUNK)
         
         # Simple sentence splitting logic (can be improved with NLTK/SpaCy)
-        # For MVP: split by . ! ? followed by space or newline
-        sentences = re.split(r'(?<=[.!?])\s+', text)
-        sentences = [s.strip() for s in sentences if s.strip()]
-        
-        chunks = []
-        for i in range(0, len(sentences), sentences_per_chunk):
-            chunk_sentences = sentences[i : i + sentences_per_chunk]
-            content = " ".join(chunk_sentences)
-            order = (i // sentences_per_chunk) + 1
-            chunks.append({
-                "id": f"chunk_{order:03d}",
-                "order": order,
-                "content": content
-            })
-            
+        # For MVP: split by . ! ? followed by space or newline. Split and
+        # group in one pass — no intermediate sentence list or re-slicing.
+        contents = []
+        group: List[str] = []
+        for sentence in iter_sentences(text):
+            group.append(sentence)
+            if len(group) == sentences_per_chunk:
+                contents.append(" ".join(group))
+                group = []
+        if group:
+            contents.append(" ".join(group))
+
         return {
-            "chunks": chunks,
+            "chunks": build_chunks(contents),
             "stats": {
-                "num_chunks": len(chunks)
+                "num_chunks": len(contents)
             }
         }
@@ -0,0 +1,24 @@
+import re
+from typing import Iterator, List
+
+# Sentence-end scanner shared by the sentence and semantic chunkers. The old
+# lookbehind split (r'(?<=[.!?])\s+') forces the regex engine into its
+# backtracking path; matching the punctuation run plus whitespace directly is
+# a single forward scan, and slicing on the match offsets replaces re.split.
+_SENT_END_RE = re.compile(r'[.!?]+\s+')
+
+def iter_sentences(text: str) -> Iterator[str]:
+    """Yield stripped, non-empty sentences at .!? boundaries one at a time."""
+    last = 0
+    for m in _SENT_END_RE.finditer(text):
+        sentence = text[last:m.end()].strip()
+        if sentence:
+            yield sentence
+        last = m.end()
+    tail = text[last:].strip()
+    if tail:
+        yield tail
+
+def split_sentences(text: str) -> List[str]:
+    """Split text into stripped, non-empty sentences at .!? boundaries."""
+    return list(iter_sentences(text))
@@ -1,23 +1,227 @@
+import atexit
 import sqlite3
 import json
 import hashlib
+import queue
+import threading
+import time
+from collections import Counter
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional, Dict, Any, List
 import numpy as np
+from . import jsonio
 from .config import RAG_CACHE_DB
 
+# blake3 hashes small payloads several times faster than sha256 without
+# SHA extensions; fall back to the stdlib when it is not installed. The
+# state hash only has to be stable within one environment — worst case a
+# different install misses old cache rows.
+try:
+    from blake3 import blake3 as _state_digest
+except ImportError:
+    _state_digest = hashlib.sha256
+
+# Random-projection LSH for the semantic cache. A single wide bucket has
+# terrible recall (at 16 bits two 0.95-similar queries collide only ~18% of
+# the time), so we hash into several independent narrow tables and probe a
+# row if it matches in ANY of them — the standard multi-table construction.
+# With 4 tables of 8 bits each, a 0.95-similar pair collides in at least one
+# table ~90% of the time while unrelated queries still prune ~98% of rows.
+# The seed is fixed so bucket ids stay stable across processes and restarts.
+_LSH_TABLES = 4
+_LSH_BITS = 8
+_LSH_SEED = 1337
+_lsh_planes_cache: Dict[int, np.ndarray] = {}
+
+def _lsh_planes(dim: int) -> np.ndarray:
+    planes = _lsh_planes_cache.get(dim)
+    if planes is None:
+        rng = np.random.default_rng(_LSH_SEED)
+        planes = rng.standard_normal((_LSH_TABLES * _LSH_BITS, dim))
+        _lsh_planes_cache[dim] = planes
+    return planes
+
+def lsh_buckets(embedding: List[float]) -> List[int]:
+    """One sign-bit bucket id per table, packed from random projections."""
+    vec = np.asarray(embedding, dtype=np.float64)
+    bits = (_lsh_planes(vec.shape[0]) @ vec) >= 0
+    return [int(b) for b in np.packbits(bits.reshape(_LSH_TABLES, _LSH_BITS), axis=1)[:, 0]]
+
+# Embedding blobs are int8-quantized with one scale per vector: a 4-byte
+# float32 scale prefix followed by one signed byte per dimension — a quarter
+# of the float32 footprint. Cosine similarity is invariant to per-vector
+# scaling, so candidate scoring runs on the raw int8 payloads and never
+# touches the scale; it only matters when a vector is reconstructed.
+
+def _quantize(vec: np.ndarray) -> np.ndarray:
+    """Map a float vector onto [-127, 127] int8 at its own peak scale."""
+    peak = float(np.abs(vec).max()) if vec.size else 0.0
+    if peak == 0.0:
+        return np.zeros(vec.shape, dtype=np.int8)
+    return np.round(vec * (127.0 / peak)).astype(np.int8)
+
+def encode_embedding(embedding: List[float]) -> bytes:
+    """Scale-prefixed int8 blob for an embedding, as stored in the cache."""
+    vec = np.asarray(embedding, dtype=np.float32)
+    peak = float(np.abs(vec).max()) if vec.size else 0.0
+    return np.float32(peak / 127.0).tobytes() + _quantize(vec).tobytes()
+
+def decode_embedding(blob: bytes) -> List[float]:
+    """Reconstruct the float vector from a scale-prefixed int8 blob."""
+    scale = np.frombuffer(blob, dtype=np.float32, count=1)[0]
+    return (np.frombuffer(blob, dtype=np.int8, offset=4).astype(np.float32) * scale).tolist()
+
+def _query_hash(query: str) -> int:
+    """
+    64-bit hash of the (stripped) query text. Lookups seek on this fixed
+    8-byte key instead of comparing variable-length strings in the B-tree;
+    the SQL keeps an equality check on the text to be safe under collisions.
+    """
+    digest = hashlib.blake2b(query.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little", signed=True)
+
+@lru_cache(maxsize=256)
+def _state_hash(category: str, collection_name: str, num_chunks: int,
+                created_at: str, prompt_content: str) -> str:
+    """
+    Digest of the knowledge state. Memoized because a chat session hashes
+    the same multi-KB prompt for every query against one collection.
+    """
+    state_data = {
+        "category": category,
+        "collection_name": collection_name,
+        "num_chunks": num_chunks,
+        "created_at": created_at,
+        "prompt": prompt_content
+    }
+    state_str = json.dumps(state_data, sort_keys=True)
+    return _state_digest(state_str.encode()).hexdigest()
+
+# The statement variants are fixed (three filter modes, two feedback
+# directions), so build every SQL string once at import instead of an
+# f-string per call; identical text also lets SQLite's compiled-statement
+# cache hit.
+_LSH_COLS = ', '.join(f'lsh_b{i}' for i in range(_LSH_TABLES))
+_LSH_PROBE = ' OR '.join(f'lsh_b{i} = ?' for i in range(_LSH_TABLES))
+
+_FILTER_CONDITIONS = {
+    "only_positive": "coalesce(thumbs_up, 0) > 0 and coalesce(thumbs_down, 0) = 0",
+    "pos_gt_neg": "coalesce(thumbs_up, 0) > coalesce(thumbs_down, 0)",
+    "any": "1 = 1",
+}
+
+# Exact probes seek on (state_hash, query_hash) — an 8-byte key compare in
+# the index — and keep text equality as a collision guard
+_EXACT_SQL = {
+    mode: f'''
+        SELECT id, query, answer, sources FROM rag_cache
+        WHERE state_hash = ? AND query_hash = ? AND query = ? AND {cond}
+        ORDER BY created_at DESC LIMIT 1
+    '''
+    for mode, cond in _FILTER_CONDITIONS.items()
+}
+
+# Exact match and semantic-candidate fetch folded into one statement: the
+# CTE resolves the exact probe first and the candidate branch only runs
+# when it came up empty, so a lookup is a single round trip either way.
+_LOOKUP_SQL = {
+    mode: f'''
+        WITH exact AS (
+            SELECT id, query, answer, sources FROM rag_cache
+            WHERE state_hash = ? AND query_hash = ? AND query = ? AND {cond}
+            ORDER BY created_at DESC LIMIT 1
+        )
+        SELECT 'exact' AS kind, id, query, NULL AS query_embedding,
+               NULL AS query_embedding_blob, answer, sources
+        FROM exact
+        UNION ALL
+        SELECT 'cand' AS kind, id, query, query_embedding,
+               query_embedding_blob, answer, sources
+        FROM rag_cache
+        WHERE NOT EXISTS (SELECT 1 FROM exact)
+        AND state_hash = ? AND {cond}
+        AND (query_embedding_blob IS NOT NULL OR query_embedding IS NOT NULL)
+        AND ({_LSH_PROBE} OR lsh_b0 IS NULL)
+    '''
+    for mode, cond in _FILTER_CONDITIONS.items()
+}
+
+_INSERT_SQL = f'''
+    INSERT INTO rag_cache (
+        query, answer, sources, state_hash, category, collection_name,
+        prompt_content, model_name, query_embedding_blob, rewritten_query,
+        rerank_used, plausible_sources, rerank_prompt, rewrite_prompt,
+        query_hash, {_LSH_COLS}
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+# Buffered hit counts land in batches of ?-sized increments
+_HIT_FLUSH_SQL = 'UPDATE rag_cache SET hit_count = hit_count + ? WHERE id = ?'
+_HIT_FLUSH_THRESHOLD = 64
+
+_FEEDBACK_SQL = {
+    "up": 'UPDATE rag_cache SET thumbs_up = thumbs_up + 1 WHERE id = ?',
+    "down": 'UPDATE rag_cache SET thumbs_down = thumbs_down + 1 WHERE id = ?',
+}
+
+# Stamped into PRAGMA user_version after a successful migration; bump it
+# whenever the migration block in _init_db changes so old databases get
+# re-probed exactly once
+_SCHEMA_VERSION = 3
+
 class RAGCache:
     def __init__(self, db_path: Path = RAG_CACHE_DB):
         self.db_path = db_path
         self._init_db()
+        # One long-lived connection instead of an open/close per call: the
+        # open pays a file open plus schema read every time. Streamlit serves
+        # sessions from worker threads, so the connection is shared across
+        # threads and serialized by a lock.
+        self._conn = self._connect()
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        # Hit counts are buffered in memory: a cache hit is semantically a
+        # read and should not pay a commit fsync per lookup
+        self._pending_hits: Counter = Counter()
+        atexit.register(self._flush_hits)
+        # Saves land through a background writer so the chat path never
+        # waits on a commit fsync; bursts batch into one transaction.
+        # Registered after the hit flush so the LIFO atexit order drains
+        # pending saves first.
+        self._write_q: queue.Queue = queue.Queue()
+        threading.Thread(target=self._writer_loop, daemon=True).start()
+        atexit.register(self._drain_writes)
+
+    def _connect(self) -> sqlite3.Connection:
+        # cached_statements raised so every statement variant stays compiled
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, cached_statements=256)
+        # WAL lets the UI keep reading the cache while saves commit, and
+        # synchronous=NORMAL under WAL drops the second fsync per commit
+        # without risking corruption. The rest trims per-call overhead:
+        # temp tables in RAM, a 64 MiB page cache, and a busy timeout so
+        # concurrent writers back off instead of failing.
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-65536")
+        conn.execute("PRAGMA busy_timeout=5000")
+        return conn
 
     def _init_db(self):
         """Initializes the SQLite database schema."""
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
-        
+
+        # Databases already migrated to the current schema skip the whole
+        # table_info/ALTER probe block
+        if cursor.execute("PRAGMA user_version").fetchone()[0] >= _SCHEMA_VERSION:
+            conn.close()
+            return
+
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS rag_cache (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -61,6 +265,32 @@ class RAGCache:
             cursor.execute('ALTER TABLE rag_cache ADD COLUMN rerank_prompt TEXT')
         if 'rewrite_prompt' not in columns:
             cursor.execute('ALTER TABLE rag_cache ADD COLUMN rewrite_prompt TEXT')
+        if 'query_embedding_blob' not in columns:
+            cursor.execute('ALTER TABLE rag_cache ADD COLUMN query_embedding_blob BLOB')
+        if 'query_hash' not in columns:
+            cursor.execute('ALTER TABLE rag_cache ADD COLUMN query_hash INTEGER')
+            # Backfill so pre-existing rows stay reachable by the hashed probe
+            conn.create_function("qhash64", 1, _query_hash)
+            cursor.execute('UPDATE rag_cache SET query_hash = qhash64(query) WHERE query IS NOT NULL')
+        # One bucket column per LSH table (an earlier single-table lsh_bucket
+        # column may linger in old databases; it is simply ignored)
+        for i in range(_LSH_TABLES):
+            if f'lsh_b{i}' not in columns:
+                cursor.execute(f'ALTER TABLE rag_cache ADD COLUMN lsh_b{i} INTEGER')
+
+        # v3: blobs written before quantization hold raw float32; rewrite
+        # them into the scale-prefixed int8 format so one decode path (and
+        # one integer candidate matrix) covers every row
+        if 'query_embedding_blob' in columns:
+            old_blobs = cursor.execute(
+                'SELECT id, query_embedding_blob FROM rag_cache WHERE query_embedding_blob IS NOT NULL'
+            ).fetchall()
+            if old_blobs:
+                cursor.executemany(
+                    'UPDATE rag_cache SET query_embedding_blob = ? WHERE id = ?',
+                    [(encode_embedding(np.frombuffer(blob, dtype=np.float32)), row_id)
+                     for row_id, blob in old_blobs],
+                )
             
         # Drop old unused columns if they exist
         for col_to_drop in ['feedback', 'rating_comment']:
@@ -70,190 +300,314 @@ class RAGCache:
                 except sqlite3.OperationalError:
                     pass
         
-        # Index for faster lookup
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_state_query ON rag_cache (state_hash, query)')
+        # Indexes that keyed on the full query text bloated the B-tree with
+        # variable-length paragraphs; the hashed variant replaces them
+        cursor.execute('DROP INDEX IF EXISTS idx_state_query')
+        cursor.execute('DROP INDEX IF EXISTS idx_state_query_covering')
+        # Covering index for the exact-match probe: the 8-byte query hash,
+        # filter flags, sort key and id all resolve inside the B-tree; only
+        # hash-colliding rows (in practice, the matches) pay a rowid lookup
+        # for the text equality check
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_state_qhash
+            ON rag_cache (state_hash, query_hash, created_at DESC, thumbs_up, thumbs_down, id)
+        ''')
+        # Partial index matching the semantic candidate scan's embedding
+        # predicate, so state_hash seeks skip rows with no embedding at all
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_state_hasemb
+            ON rag_cache (state_hash)
+            WHERE query_embedding_blob IS NOT NULL OR query_embedding IS NOT NULL
+        ''')
+        cursor.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
         conn.commit()
         conn.close()
 
+    def _record_hit(self, row_id: int):
+        """Buffer a hit_count bump; flushed in batches. Caller holds _lock."""
+        self._pending_hits[row_id] += 1
+        if len(self._pending_hits) >= _HIT_FLUSH_THRESHOLD:
+            self._flush_hits_locked()
+
+    def _flush_hits_locked(self):
+        if not self._pending_hits:
+            return
+        with self._conn:
+            self._conn.executemany(
+                _HIT_FLUSH_SQL,
+                [(count, row_id) for row_id, count in self._pending_hits.items()],
+            )
+        self._pending_hits.clear()
+
+    def _flush_hits(self):
+        """Write buffered hit counts; registered with atexit."""
+        with self._lock:
+            self._flush_hits_locked()
+
     def get_state_hash(self, category: str, collection_name: str, collection_metadata: Dict[str, Any], prompt_content: str) -> str:
         """Creates a unique hash representing the current 'knowledge state'."""
-        state_data = {
-            "category": category,
-            "collection_name": collection_name,
-            "num_chunks": collection_metadata.get("num_chunks", 0),
-            "created_at": collection_metadata.get("created_at", ""),
-            "prompt": prompt_content
-        }
-        state_str = json.dumps(state_data, sort_keys=True)
-        return hashlib.sha256(state_str.encode()).hexdigest()
+        return _state_hash(
+            category,
+            collection_name,
+            collection_metadata.get("num_chunks", 0),
+            collection_metadata.get("created_at", ""),
+            prompt_content,
+        )
 
     def check_cache(self, query: str, state_hash: str, filter_mode: str = "only_positive", query_embedding: Optional[List[float]] = None, threshold: float = 0.95) -> Optional[Dict[str, Any]]:
         """Checks if a query exists for the given state, supporting semantic similarity."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        # 1. First try exact match (fast)
-        if filter_mode == "only_positive":
-            condition = "coalesce(thumbs_up, 0) > 0 and coalesce(thumbs_down, 0) = 0"
-        elif filter_mode == "pos_gt_neg":
-            condition = "coalesce(thumbs_up, 0) > coalesce(thumbs_down, 0)"
-        else:
-            condition = "1 = 1"
-
-        cursor.execute(f'''
-            SELECT id, query, answer, sources FROM rag_cache 
-            WHERE query = ? AND state_hash = ? AND {condition}
-            ORDER BY created_at DESC LIMIT 1
-        ''', (query.strip(), state_hash))
-        
-        row = cursor.fetchone()
-        if row:
-            cursor.execute('UPDATE rag_cache SET hit_count = hit_count + 1 WHERE id = ?', (row["id"],))
-            conn.commit()
-            result = {
-                "query": row["query"],
-                "answer": row["answer"], 
-                "sources": json.loads(row["sources"]),
-                "similarity": 1.0
-            }
-            conn.close()
-            return result
-
-        # 2. Semantic Search fallback
-        if query_embedding and threshold < 1.0:
-            cursor.execute(f'''
-                SELECT id, query, query_embedding, answer, sources FROM rag_cache 
-                WHERE state_hash = ? AND {condition} AND query_embedding IS NOT NULL
-            ''', (state_hash,))
-            
-            candidates = cursor.fetchall()
-            best_match = None
-            max_sim = -1.0
-            
-            vec_a = np.array(query_embedding)
-            norm_a = np.linalg.norm(vec_a)
-            
-            for cand in candidates:
+        mode = filter_mode if filter_mode in _FILTER_CONDITIONS else "any"
+        semantic = bool(query_embedding) and threshold < 1.0
+        stripped_query = query.strip()
+        qhash = _query_hash(stripped_query)
+
+        with self._lock:
+            cursor = self._conn.cursor()
+            if semantic:
+                # Exact match and LSH-pruned semantic candidates come back
+                # from one statement: the candidate branch of the CTE only
+                # runs when the exact probe is empty. Rows written before the
+                # bucket columns existed have NULLs and are always scanned so
+                # they stay reachable.
+                buckets = lsh_buckets(query_embedding)
+                cursor.execute(_LOOKUP_SQL[mode], (state_hash, qhash, stripped_query, state_hash, *buckets))
+                fetched = cursor.fetchall()
+            else:
+                cursor.execute(_EXACT_SQL[mode], (state_hash, qhash, stripped_query))
+                fetched = cursor.fetchall()
+
+            if fetched and (not semantic or fetched[0]["kind"] == "exact"):
+                row = fetched[0]
+                self._record_hit(row["id"])
+                return {
+                    "query": row["query"],
+                    "answer": row["answer"],
+                    "sources": jsonio.loads(row["sources"]),
+                    "similarity": 1.0
+                }
+
+            if not semantic:
+                return None
+            candidates = fetched
+
+        # Similarity math runs outside the lock; only the hit-count bump
+        # takes it again. All candidates are scored with one matrix-vector
+        # product instead of a NumPy dispatch per row.
+        best_match = None
+        max_sim = -1.0
+
+        decoded = []
+        rows = []
+        for cand in candidates:
+            blob = cand["query_embedding_blob"]
+            if blob is not None:
+                # int8 payload after the 4-byte scale prefix — a buffer view
+                decoded.append(np.frombuffer(blob, dtype=np.int8, offset=4))
+                rows.append(cand)
+            else:
+                # Legacy rows written before the blob column: JSON text,
+                # quantized here so one integer matrix covers every row
                 try:
-                    vec_b = np.array(json.loads(cand["query_embedding"]))
-                    dot = np.dot(vec_a, vec_b)
-                    norm_b = np.linalg.norm(vec_b)
-                    similarity = dot / (norm_a * norm_b) if (norm_a * norm_b) > 0 else 0
-                    
-                    if similarity >= threshold and similarity > max_sim:
-                        max_sim = similarity
-                        best_match = cand
-                except:
+                    decoded.append(_quantize(np.asarray(jsonio.loads(cand["query_embedding"]), dtype=np.float32)))
+                    rows.append(cand)
+                except Exception:
                     continue
-            
-            if best_match:
-                cursor.execute('UPDATE rag_cache SET hit_count = hit_count + 1 WHERE id = ?', (best_match["id"],))
-                conn.commit()
-                result = {
-                    "query": best_match["query"],
-                    "answer": best_match["answer"],
-                    "sources": json.loads(best_match["sources"]),
-                    "similarity": float(max_sim)
-                }
-                conn.close()
-                return result
 
-        conn.close()
+        if rows:
+            try:
+                # Per-vector quantization scales cancel in cosine, so the
+                # dot products stay integer end to end; int32 accumulation
+                # because int16 would overflow past ~250 dimensions
+                matrix = np.asarray(decoded, dtype=np.int8).astype(np.int32)
+                vec = _quantize(np.asarray(query_embedding, dtype=np.float32)).astype(np.int32)
+                norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(vec)
+                norms[norms == 0] = np.inf
+                sims = (matrix @ vec) / norms
+                idx = int(np.argmax(sims))
+                if sims[idx] >= threshold:
+                    max_sim = float(sims[idx])
+                    best_match = rows[idx]
+            except ValueError:
+                # Mixed embedding dimensions in one state_hash; nothing
+                # sensible to compare against
+                pass
+
+        if best_match:
+            with self._lock:
+                self._record_hit(best_match["id"])
+            return {
+                "query": best_match["query"],
+                "answer": best_match["answer"],
+                "sources": jsonio.loads(best_match["sources"]),
+                "similarity": float(max_sim)
+            }
+
         return None
 
     def save_to_cache(self, query: str, answer: str, sources: List[Dict[str, Any]], state_hash: str, category: str, collection_name: str, prompt_content: str, model_name: str = "", query_embedding: Optional[List[float]] = None, rewritten_query: Optional[str] = None, rerank_used: bool = False, plausible_sources: Optional[List[Dict[str, Any]]] = None, rerank_prompt: Optional[str] = None, rewrite_prompt: Optional[str] = None):
-        """Saves a new interaction to the cache with prompt metadata."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO rag_cache (
-                query, answer, sources, state_hash, category, collection_name, 
-                prompt_content, model_name, query_embedding, rewritten_query, 
-                rerank_used, plausible_sources, rerank_prompt, rewrite_prompt
-            )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            query.strip(), 
-            answer, 
-            json.dumps(sources), 
-            state_hash, 
-            category, 
-            collection_name, 
-            prompt_content, 
-            model_name, 
-            json.dumps(query_embedding) if query_embedding else None,
-            rewritten_query,
-            1 if rerank_used else 0,
-            json.dumps(plausible_sources) if plausible_sources else None,
-            rerank_prompt,
-            rewrite_prompt
-        ))
-        
-        conn.commit()
-        conn.close()
+        """
+        Queues a new interaction for the background writer and returns
+        immediately; the commit happens off the request thread. Readers
+        that depend on the row landing first (feedback, list view) join
+        the queue before querying.
+        """
+        self._write_q.put({
+            "query": query,
+            "answer": answer,
+            "sources": sources,
+            "state_hash": state_hash,
+            "category": category,
+            "collection_name": collection_name,
+            "prompt_content": prompt_content,
+            "model_name": model_name,
+            "query_embedding": query_embedding,
+            "rewritten_query": rewritten_query,
+            "rerank_used": rerank_used,
+            "plausible_sources": plausible_sources,
+            "rerank_prompt": rerank_prompt,
+            "rewrite_prompt": rewrite_prompt,
+        })
+
+    def _writer_loop(self):
+        while True:
+            batch = [self._write_q.get()]
+            # Gather a short burst so consecutive saves share one commit
+            deadline = time.monotonic() + 0.05
+            while len(batch) < 128:
+                try:
+                    batch.append(self._write_q.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            try:
+                self.save_many_to_cache(batch)
+            except Exception:
+                # A failed batch is dropped; the writer must survive to
+                # serve later saves
+                pass
+            finally:
+                for _ in batch:
+                    self._write_q.task_done()
+
+    def _drain_writes(self):
+        """Block until every queued save has been committed."""
+        self._write_q.join()
+
+    def save_many_to_cache(self, rows: List[Dict[str, Any]]):
+        """
+        Inserts several interactions in one transaction. A burst of saves
+        pays a single BEGIN/COMMIT (one fsync) instead of one per row; each
+        dict takes the same keys as save_to_cache's arguments.
+        """
+        if not rows:
+            return
+
+        payload = []
+        for r in rows:
+            query_embedding = r.get("query_embedding")
+            buckets = lsh_buckets(query_embedding) if query_embedding else [None] * _LSH_TABLES
+            stripped_query = r["query"].strip()
+            payload.append((
+                stripped_query,
+                r["answer"],
+                jsonio.dumps(r.get("sources", [])),
+                r["state_hash"],
+                r.get("category"),
+                r.get("collection_name"),
+                r.get("prompt_content"),
+                r.get("model_name", ""),
+                encode_embedding(query_embedding) if query_embedding else None,
+                r.get("rewritten_query"),
+                1 if r.get("rerank_used") else 0,
+                jsonio.dumps(r["plausible_sources"]) if r.get("plausible_sources") else None,
+                r.get("rerank_prompt"),
+                r.get("rewrite_prompt"),
+                _query_hash(stripped_query),
+                *buckets,
+            ))
+
+        with self._lock:
+            # The connection context manager wraps the executemany in one
+            # explicit transaction
+            with self._conn:
+                self._conn.executemany(_INSERT_SQL, payload)
 
     def update_feedback(self, query: str, state_hash: str, feedback_type: str):
         """Increments thumbs_up or thumbs_down for the most recent entry."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        column = "thumbs_up" if feedback_type == "up" else "thumbs_down"
-        
-        # Get the ID of the last entry for this query/state
-        cursor.execute('''
-            SELECT id FROM rag_cache 
-            WHERE query = ? AND state_hash = ? 
-            ORDER BY created_at DESC LIMIT 1
-        ''', (query.strip(), state_hash))
-        
-        row = cursor.fetchone()
-        if row:
-            cursor.execute(f'UPDATE rag_cache SET {column} = {column} + 1 WHERE id = ?', (row[0],))
-        
-        conn.commit()
-        conn.close()
+        update_sql = _FEEDBACK_SQL["up" if feedback_type == "up" else "down"]
 
-    def list_cache(self, category: Optional[str] = None, collection_name: Optional[str] = None) -> List[Dict[str, Any]]:
-        """Returns entries from the cache with optional filtering."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        query = 'SELECT * FROM rag_cache'
+        # The entry being rated may still sit in the writer queue
+        self._drain_writes()
+        with self._lock:
+            cursor = self._conn.cursor()
+            # Get the ID of the last entry for this query/state
+            stripped_query = query.strip()
+            cursor.execute('''
+                SELECT id FROM rag_cache
+                WHERE state_hash = ? AND query_hash = ? AND query = ?
+                ORDER BY created_at DESC LIMIT 1
+            ''', (state_hash, _query_hash(stripped_query), stripped_query))
+
+            row = cursor.fetchone()
+            if row:
+                cursor.execute(update_sql, (row["id"],))
+            self._conn.commit()
+
+    def list_cache(self, category: Optional[str] = None, collection_name: Optional[str] = None,
+                   limit: int = 500, offset: int = 0) -> List[Dict[str, Any]]:
+        """
+        Returns summary rows for the cache list view. Only the columns the
+        list headers render are projected; the large payload fields (answer,
+        sources, prompts, embedding) stay on disk until get_cache_entry is
+        called for one row.
+        """
+        query = ('SELECT id, query, category, collection_name, model_name, '
+                 'thumbs_up, thumbs_down, hit_count, created_at, '
+                 'rewritten_query IS NOT NULL AS rewritten_query, '
+                 'rerank_used FROM rag_cache')
         params = []
         conditions = []
-        
+
         if category:
             conditions.append('category = ?')
             params.append(category)
         if collection_name:
             conditions.append('collection_name = ?')
             params.append(collection_name)
-            
+
         if conditions:
             query += ' WHERE ' + ' AND '.join(conditions)
-        
-        query += ' ORDER BY created_at DESC'
-        
-        cursor.execute(query, params)
-        rows = [dict(row) for row in cursor.fetchall()]
-        conn.close()
-        return rows
+
+        query += ' ORDER BY created_at DESC LIMIT ? OFFSET ?'
+        params.extend([limit, offset])
+
+        # Show saves that are still queued on the background writer
+        self._drain_writes()
+        with self._lock:
+            # The UI reads hit_count, so land any buffered bumps first
+            self._flush_hits_locked()
+            cursor = self._conn.cursor()
+            # Plain tuples zipped against one shared column list: skips the
+            # per-row sqlite3.Row wrapper that dict(row) would allocate and
+            # walk. Dicts (not Rows) so st.cache_data can pickle the result.
+            cursor.row_factory = None
+            fetched = cursor.execute(query, params).fetchall()
+            columns = [d[0] for d in cursor.description]
+        return [dict(zip(columns, row)) for row in fetched]
+
+    def get_cache_entry(self, entry_id: int) -> Optional[Dict[str, Any]]:
+        """Full row for a single entry, fetched when the UI expands it."""
+        with self._lock:
+            row = self._conn.execute('SELECT * FROM rag_cache WHERE id = ?', (entry_id,)).fetchone()
+        return dict(row) if row else None
 
     def delete_cache_entry(self, entry_id: int):
         """Deletes a specific entry from the cache."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('DELETE FROM rag_cache WHERE id = ?', (entry_id,))
-        conn.commit()
-        conn.close()
+        with self._lock:
+            self._conn.execute('DELETE FROM rag_cache WHERE id = ?', (entry_id,))
+            self._conn.commit()
 
     def purge_all(self):
         """Deletes all entries from the cache."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('DELETE FROM rag_cache')
-        conn.commit()
-        conn.close()
+        with self._lock:
+            self._conn.execute('DELETE FROM rag_cache')
+            self._conn.commit()
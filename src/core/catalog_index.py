@@ -0,0 +1,153 @@
+import json
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .storage import StorageManager
+from .config import CATALOG_INDEX_DB
+
+class CatalogIndex:
+    """
+    SQLite index over per-document state so listing views (Global Explorer)
+    read one SELECT instead of a json.load per document. Rows are refreshed
+    by the ingest/convert/chunk managers when they finish writing a document.
+    """
+
+    def __init__(self, db_path: Path = CATALOG_INDEX_DB):
+        self.db_path = db_path
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.db_path)
+        # WAL lets the explorer keep reading while batch jobs update rows
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _init_db(self):
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS documents (
+                    catalog TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    size_mb REAL,
+                    created_at TEXT,
+                    conv_files_json TEXT,
+                    chunk_files_json TEXT,
+                    PRIMARY KEY (catalog, name)
+                )
+            """)
+
+    @staticmethod
+    def _list_md(directory: Path) -> List[str]:
+        """Sorted markdown names via os.listdir (no per-entry Path or stat)."""
+        try:
+            return sorted(n for n in os.listdir(directory) if n.endswith(".md"))
+        except FileNotFoundError:
+            return []
+
+    def refresh_document(self, storage: StorageManager, category: str, doc_name: str):
+        """Re-read one document's state from disk and upsert its row."""
+        doc_dir = storage.get_document_dir(category, doc_name)
+        metadata = storage.load_metadata(category, doc_name) or {}
+        conv_dir = doc_dir / "converted"
+        chunk_dir = doc_dir / "chunked"
+        conv_files = self._list_md(conv_dir)
+        chunk_files = self._list_md(chunk_dir)
+
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT INTO documents (catalog, name, size_mb, created_at, conv_files_json, chunk_files_json)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(catalog, name) DO UPDATE SET
+                    size_mb = excluded.size_mb,
+                    created_at = excluded.created_at,
+                    conv_files_json = excluded.conv_files_json,
+                    chunk_files_json = excluded.chunk_files_json
+                """,
+                (
+                    category,
+                    doc_name,
+                    metadata.get("file_size_mb"),
+                    metadata.get("created_at"),
+                    json.dumps(conv_files),
+                    json.dumps(chunk_files),
+                ),
+            )
+
+    def remove_document(self, category: str, doc_name: str):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM documents WHERE catalog = ? AND name = ?", (category, doc_name))
+
+    def remove_category(self, category: str):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM documents WHERE catalog = ?", (category,))
+
+    def fetch(self, categories: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Return indexed rows (optionally limited to some catalogs) in one query."""
+        query = "SELECT catalog, name, size_mb, created_at, conv_files_json, chunk_files_json FROM documents"
+        params: List[Any] = []
+        if categories is not None:
+            placeholders = ",".join("?" for _ in categories)
+            query += f" WHERE catalog IN ({placeholders})"
+            params = list(categories)
+        query += " ORDER BY catalog, name"
+
+        with self._connect() as conn:
+            rows = conn.execute(query, params).fetchall()
+
+        return [
+            {
+                "catalog": r[0],
+                "name": r[1],
+                "size_mb": r[2],
+                "created_at": r[3],
+                "conv_files": json.loads(r[4]) if r[4] else [],
+                "chunk_files": json.loads(r[5]) if r[5] else [],
+            }
+            for r in rows
+        ]
+
+    def rebuild(self, storage: StorageManager):
+        """Full rescan of the data root; used to seed or repair the index."""
+        pairs = [
+            (category, doc_name)
+            for category in storage.list_categories()
+            for doc_name in storage.list_documents(category)
+        ]
+
+        def _scan(pair):
+            category, doc_name = pair
+            doc_dir = storage.get_document_dir(category, doc_name)
+            metadata = storage.load_metadata(category, doc_name) or {}
+            return (
+                category,
+                doc_name,
+                metadata.get("file_size_mb"),
+                metadata.get("created_at"),
+                json.dumps(self._list_md(doc_dir / "converted")),
+                json.dumps(self._list_md(doc_dir / "chunked")),
+            )
+
+        # The per-document metadata reads and listdir calls are all syscalls
+        # that release the GIL, so a thread pool overlaps them instead of
+        # walking the library serially
+        rows = []
+        if pairs:
+            with ThreadPoolExecutor(max_workers=min(16, len(pairs))) as pool:
+                rows = list(pool.map(_scan, pairs))
+
+        # Swap the table contents in one transaction so a concurrent explorer
+        # read never observes a half-built index
+        with self._connect() as conn:
+            conn.execute("DELETE FROM documents")
+            conn.executemany(
+                """
+                INSERT INTO documents (catalog, name, size_mb, created_at, conv_files_json, chunk_files_json)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                rows,
+            )
@@ -1,8 +1,33 @@
+import hashlib
+import importlib
+import json
+import os
 from abc import ABC, abstractmethod
 from typing import List, Dict, Any, Tuple, Optional
 from pathlib import Path
 from datetime import datetime
 from .storage import StorageManager
+from .catalog_index import CatalogIndex
+from .config import CHUNK_CACHE_DIR
+
+# Ids for documents up to 999 chunks come from this table instead of an
+# f-string format per chunk; longer documents fall back per id.
+_CHUNK_IDS = [f"chunk_{i:03d}" for i in range(1000)]
+
+def build_chunks(contents: List[str]) -> List[Dict[str, Any]]:
+    """
+    Assemble the standard chunk dict list from an ordered list of content
+    strings. Chunkers accumulate plain strings in their hot loops and only
+    pay for the dicts once, here.
+    """
+    return [
+        {
+            "id": _CHUNK_IDS[i] if i < 1000 else f"chunk_{i:03d}",
+            "order": i,
+            "content": content,
+        }
+        for i, content in enumerate(contents, start=1)
+    ]
 
 class ChunkerBase(ABC):
     @property
@@ -23,48 +48,141 @@ class ChunkerBase(ABC):
         """
         pass
 
+    def chunk_cached(self, text: str, config: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Content-addressed wrapper around chunk(): identical (text, chunker,
+        version, config) triples replay the stored result instead of redoing
+        the work — for the semantic chunker that includes the embedding calls.
+        """
+        key = hashlib.blake2b(
+            f"{self.name}|{self.version}|{json.dumps(config, sort_keys=True)}".encode("utf-8")
+            + text.encode("utf-8"),
+            digest_size=16,
+        ).hexdigest()
+        cache_path = CHUNK_CACHE_DIR / f"{key}.json"
+        try:
+            with open(cache_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            pass
+
+        result = self.chunk(text, config)
+
+        # Never persist failure payloads (the semantic chunker reports a
+        # transient embedding outage as a single "error" chunk) — a cached
+        # error would be replayed forever for this (text, config) pair.
+        if any(c.get("id") == "error" for c in result.get("chunks", [])):
+            return result
+
+        # Write atomically so a crashed run never leaves a truncated entry
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix(".json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(result, f)
+        os.replace(tmp_path, cache_path)
+        return result
+
 class ChunkerManager:
-    def __init__(self, storage: StorageManager):
+    def __init__(self, storage: StorageManager, catalog_index: Optional[CatalogIndex] = None):
         self.storage = storage
+        self.catalog_index = catalog_index if catalog_index is not None else CatalogIndex()
         self.chunkers: Dict[str, ChunkerBase] = {}
+        self._lazy_chunkers: Dict[str, str] = {}
 
     def register_chunker(self, chunker: ChunkerBase):
         self.chunkers[chunker.name] = chunker
 
+    def register_lazy(self, name: str, import_path: str):
+        """
+        Register a chunker as "module.path:ClassName" without importing it.
+        The module is imported and the class instantiated on first use, so
+        chunker stacks that are never selected cost nothing at startup.
+        """
+        self._lazy_chunkers[name] = import_path
+
+    def get_chunker(self, name: str) -> Optional[ChunkerBase]:
+        chunker = self.chunkers.get(name)
+        if chunker is None and name in self._lazy_chunkers:
+            module_path, class_name = self._lazy_chunkers[name].split(":")
+            chunker = getattr(importlib.import_module(module_path), class_name)()
+            self.chunkers[name] = chunker
+        return chunker
+
     def run_chunking(self, category: str, doc_name: str, converted_filename: str, chunker_name: str, config: Dict[str, Any]) -> Tuple[bool, str]:
-        if chunker_name not in self.chunkers:
+        chunker = self.get_chunker(chunker_name)
+        if chunker is None:
             return False, f"Chunker {chunker_name} not registered."
         
-        chunker = self.chunkers[chunker_name]
-        
         # Load converted MD
         converted_path = self.storage.get_document_dir(category, doc_name) / "converted" / converted_filename
         if not converted_path.exists():
             return False, f"Converted Markdown '{converted_filename}' not found."
         
-        with open(converted_path, "r", encoding="utf-8") as f:
-            text = f.read()
+        text = converted_path.read_text(encoding="utf-8")
+
+        # Run chunking through the content-addressed cache
+        result = chunker.chunk_cached(text, config)
+
+        return self._write_chunk_run(category, doc_name, converted_filename, chunker, config, result)
 
+    def batch_run_chunking(self, category: str, jobs: List[Tuple[str, str]], chunker_name: str,
+                           config: Dict[str, Any], progress_callback=None) -> List[Tuple[str, bool, str]]:
+        """
+        Chunk several documents in one run. jobs is a list of
+        (doc_name, converted_filename). For the semantic chunker, sentences
+        from every document are embedded in one batched pass over a shared
+        connection instead of one round-trip series per document; other
+        chunkers just loop run_chunking.
+        """
+        chunker = self.get_chunker(chunker_name)
+        if chunker is None:
+            return [(doc_name, False, f"Chunker {chunker_name} not registered.") for doc_name, _ in jobs]
+        results: List[Tuple[str, bool, str]] = []
+
+        if not hasattr(chunker, "chunk_from_embeddings"):
+            for done, (doc_name, conv_name) in enumerate(jobs, start=1):
+                success, msg = self.run_chunking(category, doc_name, conv_name, chunker_name, config)
+                results.append((doc_name, success, msg))
+                if progress_callback:
+                    progress_callback(done, len(jobs))
+            return results
+
+        # Split every document up-front so one embedding pass covers them all
+        valid_jobs = []
+        for doc_name, conv_name in jobs:
+            converted_path = self.storage.get_document_dir(category, doc_name) / "converted" / conv_name
+            if not converted_path.exists():
+                results.append((doc_name, False, f"Converted Markdown '{conv_name}' not found."))
+                continue
+            text = converted_path.read_text(encoding="utf-8")
+            valid_jobs.append((doc_name, conv_name, chunker.split_sentences(text)))
+
+        all_sentences = [s for _, _, sentences in valid_jobs for s in sentences]
+        try:
+            all_embeddings = chunker.embed_texts(all_sentences, config) if all_sentences else []
+        except Exception as e:
+            results.extend((doc_name, False, f"Embedding Error: {str(e)}") for doc_name, _, _ in valid_jobs)
+            return results
+
+        # Slice embeddings back per document via running offsets
+        offset = 0
+        for done, (doc_name, conv_name, sentences) in enumerate(valid_jobs, start=1):
+            doc_embeddings = all_embeddings[offset : offset + len(sentences)]
+            offset += len(sentences)
+            result = chunker.chunk_from_embeddings(sentences, doc_embeddings, config)
+            success, msg = self._write_chunk_run(category, doc_name, conv_name, chunker, config, result)
+            results.append((doc_name, success, msg))
+            if progress_callback:
+                progress_callback(done, len(valid_jobs))
+
+        return results
+
+    def _write_chunk_run(self, category: str, doc_name: str, converted_filename: str,
+                         chunker: ChunkerBase, config: Dict[str, Any], result: Dict[str, Any]) -> Tuple[bool, str]:
         # Load metadata to get document_id
         metadata = self.storage.load_metadata(category, doc_name)
         doc_id = metadata["document_id"] if metadata else "unknown_id"
 
-        # Run chunking
-        result = chunker.chunk(text, config)
-        
-        # Format output content
-        output_lines = []
-        for chunk in result["chunks"]:
-            # User request: format id as ID_DOKUMENTU:LP
-            chunk_id = f"{doc_id}:{chunk['order']:03d}"
-            chunk["id"] = chunk_id # Update in result for metadata consistency
-            output_lines.append(f"<!-- chunk_id_start: {chunk_id} -->")
-            output_lines.append(chunk["content"])
-            output_lines.append(f"<!-- chunk_id_end: {chunk_id} -->")
-            output_lines.append("")
-        
-        output_content = "\n".join(output_lines)
-        
         # Save chunked file
         # User request: chunks should contain info about converter in name
         # converted_filename is expected to be: <doc_name>__<tool>__v<version>.md
@@ -80,8 +198,25 @@ class ChunkerManager:
         chunked_dir = self.storage.get_document_dir(category, doc_name) / "chunked"
         output_path = chunked_dir / filename
         
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write(output_content)
+        # User request: format id as ID_DOKUMENTU:LP. All ids come from one
+        # bound format call up-front so the write loop below carries no
+        # per-chunk formatting or dict stores.
+        chunks = result["chunks"]
+        fmt = f"{doc_id}:{{:03d}}".format
+        ids = [fmt(chunk["order"]) for chunk in chunks]
+
+        # Stream the marker-wrapped chunks straight to the file instead of
+        # materializing one giant joined string first; the 1 MiB buffer keeps
+        # the syscall count low
+        with open(output_path, "w", encoding="utf-8", buffering=1 << 20) as f:
+            for chunk, chunk_id in zip(chunks, ids):
+                f.write(f"<!-- chunk_id_start: {chunk_id} -->\n")
+                f.write(chunk["content"])
+                f.write(f"\n<!-- chunk_id_end: {chunk_id} -->\n\n")
+
+        # Update ids in result for metadata consistency
+        for chunk, chunk_id in zip(chunks, ids):
+            chunk["id"] = chunk_id
 
         if metadata:
             # Add/Update current run info
@@ -94,8 +229,9 @@ class ChunkerManager:
                 "filename": filename
             }
             
-            # Sync metadata with filesystem
-            existing_files = {f.name for f in chunked_dir.glob("*.md")}
+            # Sync metadata with filesystem; listdir returns plain names
+            # without the per-entry Path construction glob pays
+            existing_files = {n for n in os.listdir(chunked_dir) if n.endswith(".md")}
             
             # Keep only entries where file exists
             updated_chunking = [
@@ -108,4 +244,6 @@ class ChunkerManager:
             metadata["chunking"] = updated_chunking
             self.storage.save_metadata(category, doc_name, metadata)
 
-        return True, f"Successfully chunked using {chunker_name} -> {filename}"
+        self.catalog_index.refresh_document(self.storage, category, doc_name)
+
+        return True, f"Successfully chunked using {chunker.name} -> {filename}"
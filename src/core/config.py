@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 # UI Settings
@@ -13,8 +14,19 @@ ALLOWED_EXTENSIONS = {'.pdf', '.docx'}
 
 # Conversion Settings
 DEFAULT_CONVERTER_VERSION = "1.0"
+# Content-addressed cache of conversion results, keyed by source hash + tool + version
+CONVERSION_CACHE_DIR = DATA_ROOT / "_conversion_cache"
+# Worker count for batch conversion; overridable via env for constrained hosts
+BATCH_CONVERT_WORKERS = int(os.environ.get(
+    "LOAD_DOCUMENTS_NUMBER_OF_THREADS",
+    max(1, (os.cpu_count() or 2) - 1)
+))
 
 # Chunking Settings
+# Content-addressed cache of chunk runs, keyed by text hash + chunker + config
+CHUNK_CACHE_DIR = DATA_ROOT / "_chunk_cache"
+# Consumer count for the batch-chunking pipeline
+BATCH_CHUNK_WORKERS = int(os.environ.get("BATCH_CHUNK_WORKERS", max(1, (os.cpu_count() or 2) - 1)))
 DEFAULT_SENTENCES_PER_CHUNK = 8
 DEFAULT_MIN_CHUNK_LENGTH = 400
 DEFAULT_CHUNKER_VERSION = "1.0"
@@ -51,6 +63,8 @@ DEFAULT_RERANK_TOP_N = 3
 
 # Cache & Quality
 RAG_CACHE_DB = DATA_ROOT / "rag_cache.db"
+# SQLite index of per-document state backing the Global Explorer
+CATALOG_INDEX_DB = DATA_ROOT / "catalog.db"
 CACHE_ENABLED = True
 CACHE_SIMILARITY_THRESHOLD = 0.73  # How similar query must be to hit cache
 DEFAULT_CACHE_MODE = "Only Positive" # Options: "Only Positive", "Positive > Negative"
@@ -59,4 +73,6 @@ DEFAULT_CACHE_MODE = "Only Positive" # Options: "Only Positive", "Positive > Neg
 DEFAULT_ENRICH_BASE_URL = "http://127.0.0.1:1234/v1"
 DEFAULT_ENRICH_API_KEY = "not_applicable"
 DEFAULT_ENRICH_MODEL = "bielik-4.5b-v3.0-instruct"
-DEFAULT_ENRICH_MAX_CHARS = 180
\ No newline at end of file
+DEFAULT_ENRICH_MAX_CHARS = 180
+# Content-addressed cache of enrichment results, keyed by chunk-text hash
+ENRICHMENT_CACHE_DIR = DATA_ROOT / "_enrichment_cache"
\ No newline at end of file
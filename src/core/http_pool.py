@@ -0,0 +1,33 @@
+"""
+Shared httpx client for the OpenAI-compatible endpoints.
+
+Every manager used to build its own httpx.Client, so LLM, embedding and
+enrichment traffic each renegotiated TLS over a private connection pool.
+One process-wide client keeps connections alive across managers and
+Streamlit reruns; httpx pools per host internally, so the same client
+serves all configured base URLs.
+"""
+import threading
+from typing import Optional
+
+import httpx
+
+_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32)
+# Generous read timeout: answer streams stay open for the whole response
+_TIMEOUT = httpx.Timeout(300.0, connect=5.0)
+
+_client: Optional[httpx.Client] = None
+_lock = threading.Lock()
+
+
+def shared_http_client() -> httpx.Client:
+    global _client
+    with _lock:
+        if _client is None:
+            try:
+                # HTTP/2 multiplexes the concurrent embed/LLM calls over one
+                # connection, but needs the optional h2 package
+                _client = httpx.Client(verify=False, http2=True, limits=_LIMITS, timeout=_TIMEOUT)
+            except ImportError:
+                _client = httpx.Client(verify=False, limits=_LIMITS, timeout=_TIMEOUT)
+        return _client
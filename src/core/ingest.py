@@ -1,16 +1,23 @@
+import hashlib
+import json
+import shutil
 import streamlit as st
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Tuple, Optional
+from typing import IO, List, Tuple, Optional
 import uuid
 from datetime import datetime
 from .storage import StorageManager
+from .catalog_index import CatalogIndex
 from .config import DEFAULT_MAX_DOCS_PER_CATEGORY, ALLOWED_EXTENSIONS
 
 class IngestManager:
-    def __init__(self, storage: StorageManager):
+    def __init__(self, storage: StorageManager, catalog_index: Optional[CatalogIndex] = None):
         self.storage = storage
+        self.catalog_index = catalog_index if catalog_index is not None else CatalogIndex()
 
-    def validate_file(self, filename: str, file_size_bytes: int, category: str) -> Tuple[bool, str]:
+    def validate_file(self, filename: str, file_size_bytes: int, category: str,
+                      existing_docs: Optional[List[str]] = None) -> Tuple[bool, str]:
         # Extension check
         ext = Path(filename).suffix.lower()
         if ext not in ALLOWED_EXTENSIONS:
@@ -22,8 +29,9 @@ class IngestManager:
         if size_mb > max_file_size_mb:
             return False, f"File size ({size_mb:.2f} MB) exceeds limit of {max_file_size_mb} MB."
 
-        # Category limit check
-        existing_docs = self.storage.list_documents(category)
+        # Category limit check (listing may be precomputed for batch calls)
+        if existing_docs is None:
+            existing_docs = self.storage.list_documents(category)
         if len(existing_docs) >= DEFAULT_MAX_DOCS_PER_CATEGORY:
             return False, f"Category '{category}' has reached the limit of {DEFAULT_MAX_DOCS_PER_CATEGORY} documents."
 
@@ -34,7 +42,43 @@ class IngestManager:
 
         return True, ""
 
-    def process_upload(self, category: str, filename: str, file_content: bytes) -> Tuple[bool, str]:
+    def _hash_index_path(self) -> Path:
+        return self.storage.root_path / ".content_hashes.json"
+
+    def _load_hash_index(self) -> dict:
+        """digest -> [category, doc_name] for every ingested original."""
+        try:
+            with open(self._hash_index_path(), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def _save_hash_index(self, index: dict):
+        with open(self._hash_index_path(), "w", encoding="utf-8") as f:
+            json.dump(index, f, indent=2)
+
+    def _find_duplicate(self, index: dict, digest: str) -> Optional[str]:
+        """Return 'category/doc' if this content is already ingested there."""
+        entry = index.get(digest)
+        if entry and self.storage.get_document_dir(entry[0], entry[1]).exists():
+            return f"{entry[0]}/{entry[1]}"
+        return None
+
+    @staticmethod
+    def _content_digest(file_obj: IO[bytes]) -> str:
+        file_obj.seek(0)
+        digest = hashlib.file_digest(file_obj, "sha256").hexdigest()
+        file_obj.seek(0)
+        return digest
+
+    @staticmethod
+    def _file_size(file_obj: IO[bytes]) -> int:
+        file_obj.seek(0, 2)
+        size = file_obj.tell()
+        file_obj.seek(0)
+        return size
+
+    def process_upload(self, category: str, filename: str, file_obj: IO[bytes]) -> Tuple[bool, str]:
         doc_name = self.storage.sanitize_component(Path(filename).stem, max_length=50)
         
         # Check if exists first to inform user
@@ -42,39 +86,115 @@ class IngestManager:
         if doc_name in existing_docs:
             return False, f"EXISTS:{doc_name}" # Special flag to handle in UI
 
-        is_valid, error_msg = self.validate_file(filename, len(file_content), category)
+        is_valid, error_msg = self.validate_file(filename, self._file_size(file_obj), category, existing_docs)
         if not is_valid:
             return False, error_msg
 
-        return self._ingest(category, filename, file_content)
+        # Identical bytes under a different filename would be embedded twice
+        # downstream; skip them via the content-hash index.
+        hash_index = self._load_hash_index()
+        digest = self._content_digest(file_obj)
+        duplicate = self._find_duplicate(hash_index, digest)
+        if duplicate:
+            return False, f"Identical content already ingested as {duplicate}."
+
+        success, msg = self._ingest(category, filename, file_obj)
+        if success:
+            hash_index[digest] = [category, doc_name]
+            self._save_hash_index(hash_index)
+        return success, msg
+
+    def process_batch(self, category: str, files: List[Tuple[str, IO[bytes]]],
+                      progress_callback=None) -> List[Tuple[str, bool, str]]:
+        """
+        Ingest several uploads in one call. Validation runs up-front against a
+        single category listing; the IO-bound copies then fan out to a thread
+        pool so disk writes overlap instead of serializing on the main thread.
+        progress_callback(done, total) is invoked from the calling thread as
+        copies complete.
+        """
+        existing_docs = list(self.storage.list_documents(category))
+        hash_index = self._load_hash_index()
+        digests = {}
+        results = {}
+        to_ingest = []
+        for filename, file_obj in files:
+            doc_name = self.storage.sanitize_component(Path(filename).stem, max_length=50)
+            if doc_name in existing_docs:
+                results[filename] = (False, f"EXISTS:{doc_name}")  # Special flag to handle in UI
+                continue
+            is_valid, error_msg = self.validate_file(
+                filename, self._file_size(file_obj), category, existing_docs
+            )
+            if not is_valid:
+                results[filename] = (False, error_msg)
+                continue
+            digest = self._content_digest(file_obj)
+            # In-batch duplicates are checked against the digests collected in
+            # this pre-pass: the on-disk probe in _find_duplicate cannot see
+            # them because the first file's directory only appears once its
+            # ingest finishes in the pool.
+            if digest in digests.values():
+                results[filename] = (False, "Identical content already in this batch.")
+                continue
+            duplicate = self._find_duplicate(hash_index, digest)
+            if duplicate:
+                results[filename] = (False, f"Identical content already ingested as {duplicate}.")
+                continue
+            hash_index[digest] = [category, doc_name]
+            digests[filename] = digest
+            existing_docs.append(doc_name)
+            to_ingest.append((filename, file_obj))
+
+        if to_ingest:
+            with ThreadPoolExecutor(max_workers=min(8, len(to_ingest))) as pool:
+                futures = {
+                    pool.submit(self._ingest, category, fn, fo): fn
+                    for fn, fo in to_ingest
+                }
+                for done, future in enumerate(as_completed(futures), start=1):
+                    results[futures[future]] = future.result()
+                    if progress_callback:
+                        progress_callback(done, len(to_ingest))
+            # Persist digests only for files that actually landed on disk
+            for fn, _ in to_ingest:
+                if not results[fn][0]:
+                    hash_index.pop(digests[fn], None)
+            self._save_hash_index(hash_index)
+
+        return [(fn, *results[fn]) for fn, _ in files]
 
-    def _ingest(self, category: str, filename: str, file_content: bytes) -> Tuple[bool, str]:
+    def _ingest(self, category: str, filename: str, file_obj: IO[bytes]) -> Tuple[bool, str]:
         doc_name = self.storage.sanitize_component(Path(filename).stem, max_length=50)
         # Ensure directory structure
         paths = self.storage.ensure_document_structure(category, doc_name)
         
         # Save original file with a shortened name to avoid path limits
+        # Stream in 1 MiB blocks instead of materializing the full bytes
         ext = Path(filename).suffix
         local_filename = f"source{ext}"
         original_path = paths["original"] / local_filename
+        file_obj.seek(0)
         with open(original_path, "wb") as f:
-            f.write(file_content)
+            shutil.copyfileobj(file_obj, f, length=1024 * 1024)
+        size_bytes = original_path.stat().st_size
 
         # Initialize metadata
         metadata = {
             "document_id": str(uuid.uuid4()),
             "original_filename": filename,
-            "file_size_mb": round(len(file_content) / (1024 * 1024), 2),
+            "file_size_mb": round(size_bytes / (1024 * 1024), 2),
             "created_at": datetime.now().isoformat(),
             "converted_at": None,
             "conversion": None,
             "chunking": []
         }
         self.storage.save_metadata(category, doc_name, metadata)
+        self.catalog_index.refresh_document(self.storage, category, doc_name)
 
         return True, f"Successfully uploaded {filename} to {category}/{doc_name}"
 
-    def update_document(self, category: str, filename: str, file_content: bytes, target_doc_name: Optional[str] = None) -> Tuple[bool, str]:
+    def update_document(self, category: str, filename: str, file_obj: IO[bytes], target_doc_name: Optional[str] = None) -> Tuple[bool, str]:
         # If target_doc_name is not provided, we assume it's based on the new filename
         doc_to_archive = target_doc_name if target_doc_name else Path(filename).stem
         
@@ -85,9 +205,10 @@ class IngestManager:
         
         # 2. Delete existing
         self.storage.delete_document(category, doc_to_archive)
+        self.catalog_index.remove_document(category, doc_to_archive)
         
         # 3. Fresh ingest (this will use the NEW filename for the new structure)
-        success, msg = self._ingest(category, filename, file_content)
+        success, msg = self._ingest(category, filename, file_obj)
         if success:
             return True, f"Document updated. Previous version '{doc_to_archive}' archived as {archive_name}"
         return False, msg
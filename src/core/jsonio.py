@@ -0,0 +1,33 @@
+"""
+JSON encode/decode helpers with an optional orjson fast path.
+
+orjson parses and serializes several times faster than the stdlib; when it
+is not installed these fall back to json with identical semantics for the
+str-in/str-out payloads used here (cache rows, embeddings, sources).
+"""
+import json
+
+try:
+    import orjson
+
+    def loads(data):
+        return orjson.loads(data)
+
+    def dumps(obj) -> str:
+        return orjson.dumps(obj).decode("utf-8")
+
+    def dumps_pretty(obj) -> str:
+        """2-space-indented form for the on-disk metadata files."""
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode("utf-8")
+
+except ImportError:
+
+    def loads(data):
+        return json.loads(data)
+
+    def dumps(obj) -> str:
+        return json.dumps(obj)
+
+    def dumps_pretty(obj) -> str:
+        """2-space-indented form for the on-disk metadata files."""
+        return json.dumps(obj, indent=2, ensure_ascii=False)
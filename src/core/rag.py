@@ -1,8 +1,13 @@
 import json
-import httpx
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 from openai import OpenAI
 from typing import List, Dict, Any, Optional
+from . import jsonio
+from .http_pool import shared_http_client
 from .vector_store import VectorStoreManager
 from .cache import RAGCache
 from .config import (
@@ -16,6 +21,42 @@ from .config import (
     DEFAULT_RERANK_TOP_N
 )
 
+# Fenced-code-block extractor for reranker responses, compiled once at import
+_JSON_BLOCK_RE = re.compile(r'```(?:json)?\s*(.*?)\s*```', re.DOTALL)
+
+# The prompt files live at fixed locations, so the Path objects are built
+# once at import instead of reassembled on every call
+_PROMPT_DIR = Path(__file__).parent.parent / "resources" / "prompts"
+_ASSISTANT_PROMPT_PATH = _PROMPT_DIR / "rag_assistant.txt"
+_RERANK_PROMPT_PATH = _PROMPT_DIR / "rerank_bypass.txt"
+_REWRITE_PROMPT_PATH = _PROMPT_DIR / "magic_rewrite.txt"
+
+# Placeholders are spliced in one regex pass instead of one .replace scan
+# over the whole template per variable. str.format_map would also be a
+# single pass but trips over the literal JSON braces in the rerank template.
+_TEMPLATE_VAR_RE = re.compile(r'\{\{(\w+)\}\}')
+
+def _fill_template(template: str, values: Dict[str, str]) -> str:
+    return _TEMPLATE_VAR_RE.sub(lambda m: values.get(m.group(1), m.group(0)), template)
+
+@lru_cache(maxsize=16)
+def _read_template(path: Path, mtime_ns: int) -> str:
+    return path.read_text(encoding="utf-8")
+
+def _load_template(path: Path) -> Optional[str]:
+    """Template text, or None if absent; re-read only when the file changes."""
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return _read_template(path, st.st_mtime_ns)
+
+# Rerank verdicts are cached for a short window: retried and re-run queries
+# hit the same (query, candidates) pair within minutes, and the LLM's
+# ordering for an unchanged pair is stable enough to replay.
+_RERANK_CACHE_TTL = 900.0
+_RERANK_CACHE_MAX = 1024
+
 class RAGManager:
     def __init__(self, vector_mgr: VectorStoreManager):
         self.vector_mgr = vector_mgr
@@ -23,34 +64,74 @@ class RAGManager:
         self.llm_client = OpenAI(
             base_url=DEFAULT_LLM_BASE_URL,
             api_key=DEFAULT_LLM_API_KEY,
-            http_client=httpx.Client(verify=False)
+            http_client=shared_http_client()
         )
-        self.prompt_path = Path(__file__).parent.parent / "resources" / "prompts" / "rag_assistant.txt"
+        self.prompt_path = _ASSISTANT_PROMPT_PATH
+        # Collection metadata carries every chunk, so reparsing it per query
+        # is the expensive part of the hot path; keyed on (mtime_ns, size)
+        # it only reparses after the collection is actually rebuilt
+        self._meta_cache: Dict[Path, tuple] = {}
+        # (query, candidate ids, top_n, template) -> (timestamp, kept indices)
+        self._rerank_cache: Dict[tuple, tuple] = {}
+        # Runs the speculative collection preload that overlaps the
+        # query-embedding round trip in answer_question_stream
+        self._spec_pool = ThreadPoolExecutor(max_workers=2)
         # print(f"DEBUG: RAGManager initialized. Methods: {dir(self)}")
 
     def _get_collection_metadata(self, category: str, collection_name: str) -> Dict[str, Any]:
-        """Loads metadata for a specific collection."""
+        """Loads metadata for a specific collection, cached by file mtime."""
         meta_path = self.vector_mgr.storage.root_path / category / "_vector_stores" / collection_name / "metadata.json"
-        if meta_path.exists():
-            with open(meta_path, "r", encoding="utf-8") as f:
-                return json.load(f)
-        return {}
+        try:
+            st = meta_path.stat()
+        except OSError:
+            return {}
+        key = (st.st_mtime_ns, st.st_size)
+        cached = self._meta_cache.get(meta_path)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        metadata = jsonio.loads(meta_path.read_bytes())
+        self._meta_cache[meta_path] = (key, metadata)
+        return metadata
+
+    @staticmethod
+    def _lexical_search(loaded, phrase: str, k: int) -> List[Dict[str, Any]]:
+        """
+        Ranks chunks by case-insensitive occurrence count of a literal
+        phrase. Quoted queries want exactly this, and it needs neither the
+        embedding round trip nor the reranker.
+        """
+        if loaded is None:
+            return []
+        _index, metadata = loaded
+        needle = phrase.casefold()
+        scored = []
+        for chunk in metadata["chunks"]:
+            count = chunk["text"].casefold().count(needle)
+            if count:
+                scored.append((count, chunk))
+        scored.sort(key=lambda pair: -pair[0])
+
+        hits = []
+        for count, chunk in scored[:k]:
+            hit = dict(chunk)
+            hit["score"] = float(count)
+            hits.append(hit)
+        return hits
 
     def _build_context_string(self, hits: List[Dict[str, Any]]) -> str:
         """Formats search results into a context string for the LLM."""
+        # Every piece lands in one list joined once per hit — no string
+        # concatenation temporaries in the per-request path
         context_parts = []
         for hit in hits:
-            source_info = f"[ŹRÓDŁO: {hit.get('doc_name')} | ID: {hit.get('id')}]"
-            content = hit.get('text', '')
-            
-            enrichment = ""
+            pieces = [f"[ŹRÓDŁO: {hit.get('doc_name')} | ID: {hit.get('id')}]"]
             if hit.get('summary'):
-                enrichment += f"\nPodsumowanie fragmentu: {hit['summary']}"
+                pieces.append(f"\nPodsumowanie fragmentu: {hit['summary']}")
             if hit.get('tags'):
-                enrichment += f"\nTagi: {', '.join(hit['tags'])}"
-            
-            context_parts.append(f"{source_info}{enrichment}\nTreść: {content}")
-        
+                pieces.append(f"\nTagi: {', '.join(hit['tags'])}")
+            pieces.append(f"\nTreść: {hit.get('text', '')}")
+            context_parts.append("".join(pieces))
+
         return "\n\n---\n\n".join(context_parts)
 
     def _rerank(self, query: str, hits: List[Dict[str, Any]], top_n: int = 3, custom_template: Optional[str] = None) -> List[Dict[str, Any]]:
@@ -59,34 +140,48 @@ class RAGManager:
         """
         if not hits:
             return []
-        
+
+        # Same query against the same candidate set inside the TTL window
+        # replays the cached verdict instead of paying another LLM call
+        cache_key = (query, tuple(h.get("id") for h in hits), top_n, custom_template)
+        now = time.monotonic()
+        cached = self._rerank_cache.get(cache_key)
+        if cached is not None and now - cached[0] < _RERANK_CACHE_TTL:
+            return [hits[i] for i in cached[1]]
+
         try:
-            if custom_template:
-                template = custom_template
-            else:
-                rerank_prompt_path = Path(__file__).parent.parent / "resources" / "prompts" / "rerank_bypass.txt"
-                if not rerank_prompt_path.exists():
-                    return hits[:top_n]
-                
-                with open(rerank_prompt_path, "r", encoding="utf-8") as f:
-                    template = f.read()
-            
+            template = custom_template or _load_template(_RERANK_PROMPT_PATH)
+            if not template:
+                return hits[:top_n]
+
             # Prepare text for LLM evaluation
-            docs_text = ""
-            for i, h in enumerate(hits):
-                docs_text += f"\n--- FRAGMENT [{i}] ---\n{h['text']}\n"
-            
-            prompt = template.replace("{{query}}", query)
-            prompt = prompt.replace("{{documents}}", docs_text)
-            prompt = prompt.replace("{{top_n}}", str(top_n))
+            docs_text = "".join(
+                f"\n--- FRAGMENT [{i}] ---\n{h['text']}\n" for i, h in enumerate(hits)
+            )
+
+            prompt = _fill_template(template, {"query": query, "documents": docs_text, "top_n": str(top_n)})
             
-            # Call LLM (synchronous for simplicity in this utility)
+            # Call LLM (synchronous for simplicity in this utility).
+            # The schema constrains decoding to valid {"top_indices": [...]}
+            # on backends with structured-output support, so no tokens are
+            # spent on prose and parsing cannot drift.
+            rerank_schema = {
+                "type": "object",
+                "properties": {
+                    "top_indices": {
+                        "type": "array",
+                        "items": {"type": "integer", "minimum": 0, "maximum": len(hits) - 1},
+                    }
+                },
+                "required": ["top_indices"],
+            }
             response = self.llm_client.chat.completions.create(
                 model=DEFAULT_LLM_MODEL,
                 messages=[{"role": "system", "content": "Jesteś asystentem selekcjonującym najbardziej trafne fragmenty tekstu. Odpowiadasz tylko w formacie JSON."},
                           {"role": "user", "content": prompt}],
                 temperature=0.0,
-                response_format={"type": "text"}
+                response_format={"type": "json_schema",
+                                 "json_schema": {"name": "rerank", "schema": rerank_schema, "strict": True}}
             )
             
             content = response.choices[0].message.content.strip()
@@ -94,21 +189,26 @@ class RAGManager:
             # Robust JSON extraction (in case LLM includes markdown blocks)
             if "```" in content:
                 # Try to extract content between ```json and ``` or just ```
-                import re
-                json_match = re.search(r'```(?:json)?\s*(.*?)\s*```', content, re.DOTALL)
+                json_match = _JSON_BLOCK_RE.search(content)
                 if json_match:
                     content = json_match.group(1)
             
             result_json = json.loads(content)
             top_indices = result_json.get("top_indices", [])
             
-            reranked_hits = []
-            for idx in top_indices:
-                if isinstance(idx, int) and idx < len(hits):
-                    reranked_hits.append(hits[idx])
-            
+            kept_indices = [idx for idx in top_indices if isinstance(idx, int) and idx < len(hits)]
+
             # If LLM failed to return valid indices, fallback to original Top-N
-            return reranked_hits if reranked_hits else hits[:top_n]
+            if not kept_indices:
+                return hits[:top_n]
+
+            if len(self._rerank_cache) >= _RERANK_CACHE_MAX:
+                cutoff = now - _RERANK_CACHE_TTL
+                self._rerank_cache = {k: v for k, v in self._rerank_cache.items() if v[0] > cutoff}
+                if len(self._rerank_cache) >= _RERANK_CACHE_MAX:
+                    self._rerank_cache.clear()
+            self._rerank_cache[cache_key] = (now, kept_indices)
+            return [hits[i] for i in kept_indices]
                 
         except Exception as e:
             print(f"DEBUG: LLM Rerank Bypass error: {str(e)}")
@@ -117,16 +217,11 @@ class RAGManager:
     def _rewrite_query(self, query: str, custom_template: Optional[str] = None) -> str:
         """Rewrites the user query to be more effective for RAG retrieval."""
         try:
-            if custom_template:
-                template = custom_template
-            else:
-                rewrite_prompt_path = Path(__file__).parent.parent / "resources" / "prompts" / "magic_rewrite.txt"
-                if not rewrite_prompt_path.exists():
-                    return query
-                with open(rewrite_prompt_path, "r", encoding="utf-8") as f:
-                    template = f.read()
-            
-            prompt = template.replace("{{query}}", query)
+            template = custom_template or _load_template(_REWRITE_PROMPT_PATH)
+            if not template:
+                return query
+
+            prompt = _fill_template(template, {"query": query})
             
             response = self.llm_client.chat.completions.create(
                 model=DEFAULT_LLM_MODEL,
@@ -150,12 +245,7 @@ class RAGManager:
         """Performs search and returns a generator for streaming the answer."""
         
         # 1. Load context state
-        prompt_content = ""
-        if custom_prompt:
-            prompt_content = custom_prompt
-        elif self.prompt_path.exists():
-            with open(self.prompt_path, "r", encoding="utf-8") as f:
-                prompt_content = f.read()
+        prompt_content = custom_prompt or _load_template(self.prompt_path) or ""
         
         col_metadata = self._get_collection_metadata(category, collection_name)
         # Note: we might want to include model/temp in state hash if we want separate cache for different settings
@@ -167,17 +257,27 @@ class RAGManager:
         # 2. Check Cache (ON ORIGINAL QUERY)
         query_emb = None
         original_query = query
+        # A query wrapped in quotes is a literal lookup: it is answered by a
+        # lexical scan over the collection, so embedding, rewrite and rerank
+        # are all skipped (the cache still serves exact repeats).
+        stripped_q = query.strip()
+        literal_phrase = stripped_q[1:-1] if len(stripped_q) > 2 \
+            and stripped_q.startswith('"') and stripped_q.endswith('"') else None
+        # The FAISS index + chunk metadata load is pure local I/O, so it runs
+        # speculatively while the embedding round trip is in flight; a cache
+        # hit just discards the cheap preload.
+        load_future = self._spec_pool.submit(self.vector_mgr.load_collection, category, collection_name)
         if CACHE_ENABLED:
             try:
-                # Get current collection metadata to check which embedding model to use
-                col_meta = self._get_collection_metadata(category, collection_name)
-                emb_model = col_meta.get("model", "text-embedding-embeddinggemma-300m-qat")
-                
-                # Fetch query embedding for semantic cache (needed for both check and save)
-                # We do this for the original query to maintain cache consistency
-                emb_res = self.vector_mgr.emb_client.embeddings.create(input=[original_query], model=emb_model)
-                query_emb = emb_res.data[0].embedding
-                
+                if literal_phrase is None:
+                    # col_metadata from step 1 already says which embedding model to use
+                    emb_model = col_metadata.get("model", "text-embedding-embeddinggemma-300m-qat")
+
+                    # Fetch query embedding for semantic cache (needed for both check and save)
+                    # We do this for the original query to maintain cache consistency
+                    emb_res = self.vector_mgr.emb_client.embeddings.create(input=[original_query], model=emb_model)
+                    query_emb = emb_res.data[0].embedding
+
                 if use_cache:
                     cached = self.cache.check_cache(original_query, state_hash, filter_mode=cache_filter_mode, query_embedding=query_emb, threshold=cache_threshold)
                     if cached:
@@ -201,21 +301,22 @@ class RAGManager:
 
         # 3. Magic Rewrite if enabled (ONLY ON CACHE MISS)
         rewrite_template = None
-        if use_magic_rewrite:
+        if use_magic_rewrite and literal_phrase is None:
             # Resolve rewrite template
-            if custom_rewrite_prompt:
-                rewrite_template = custom_rewrite_prompt
-            else:
-                rewrite_prompt_path = Path(__file__).parent.parent / "resources" / "prompts" / "magic_rewrite.txt"
-                if rewrite_prompt_path.exists():
-                    with open(rewrite_prompt_path, "r", encoding="utf-8") as f:
-                        rewrite_template = f.read()
-            
+            rewrite_template = custom_rewrite_prompt or _load_template(_REWRITE_PROMPT_PATH)
             query = self._rewrite_query(query, custom_template=rewrite_template)
             yield {"type": "rewritten_query", "content": query}
 
-        # 4. Search vector store
-        hits = self.vector_mgr.search(category, collection_name, query, k=top_k)
+        # 4. Search vector store — reuse the cache-probe embedding when the
+        # query text is unchanged, so a cache miss doesn't pay a second
+        # embedding round trip; a rewritten query has to be re-embedded
+        loaded = load_future.result()
+        if literal_phrase is not None:
+            hits = self._lexical_search(loaded, literal_phrase, top_k)
+        elif query_emb is not None and query == original_query:
+            hits = self.vector_mgr.search_with_embedding(category, collection_name, query_emb, k=top_k, preloaded=loaded)
+        else:
+            hits = self.vector_mgr.search(category, collection_name, query, k=top_k, preloaded=loaded)
         
         plausible_hits = []
         if not hits:
@@ -223,9 +324,10 @@ class RAGManager:
             yield {"type": "sources", "content": []}
             return
 
-        # 3.5 Optional Reranking
+        # 3.5 Optional Reranking (pointless for literal lookups — occurrence
+        # counts already rank them)
         plausible_hits = []
-        if use_reranker:
+        if use_reranker and literal_phrase is None:
             plausible_hits = hits.copy()
             yield {"type": "plausible_sources", "content": plausible_hits}
             hits = self._rerank(query, hits, top_n=rerank_top_n, custom_template=custom_rerank_prompt)
@@ -233,26 +335,38 @@ class RAGManager:
         # 4. Build Context
         context_str = self._build_context_string(hits)
         
-        # 5. Build Final Prompt
-        prompt = prompt_content.replace("{{context}}", context_str)
-        prompt = prompt.replace("{{query}}", query)
+        # 5. Build Final Prompt. The template text ahead of {{context}} is
+        # byte-identical across requests, so it goes into its own system
+        # message — OpenAI-compatible backends (vLLM/SGLang) can then reuse
+        # the prefill KV cache for that prefix and only recompute the
+        # context+query suffix.
+        marker = prompt_content.find("{{context}}")
+        template_values = {"context": context_str, "query": query}
+        if marker > 0:
+            messages = [{"role": "system", "content": prompt_content[:marker].rstrip()},
+                        {"role": "user", "content": _fill_template(prompt_content[marker:], template_values)}]
+        else:
+            messages = [{"role": "user", "content": _fill_template(prompt_content, template_values)}]
 
         try:
             # 6. Call LLM with streaming
             stream = self.llm_client.chat.completions.create(
                 model=model,
-                messages=[{"role": "user", "content": prompt}],
+                messages=messages,
                 temperature=temperature,
                 max_tokens=max_tokens,
                 stream=True
             )
             
-            full_answer = ""
+            # Collected as a list and joined once for the cache save; += on a
+            # str would recopy the whole partial answer every delta
+            answer_parts = []
             for chunk in stream:
                 if chunk.choices[0].delta.content:
                     content = chunk.choices[0].delta.content
-                    full_answer += content
+                    answer_parts.append(content)
                     yield {"type": "answer", "content": content}
+            full_answer = "".join(answer_parts)
             
             # 7. Save to Cache
             if CACHE_ENABLED:
@@ -262,13 +376,7 @@ class RAGManager:
                 # Resolve rerank template if used
                 rerank_template = None
                 if use_reranker:
-                    if custom_rerank_prompt:
-                        rerank_template = custom_rerank_prompt
-                    else:
-                        rerank_prompt_path = Path(__file__).parent.parent / "resources" / "prompts" / "rerank_bypass.txt"
-                        if rerank_prompt_path.exists():
-                            with open(rerank_prompt_path, "r", encoding="utf-8") as f:
-                                rerank_template = f.read()
+                    rerank_template = custom_rerank_prompt or _load_template(_RERANK_PROMPT_PATH)
 
                 # We save the original user query to the cache, so semantic lookup works next time
                 self.cache.save_to_cache(
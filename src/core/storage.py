@@ -1,8 +1,8 @@
-import json
 import re
 import hashlib
 from pathlib import Path
 from typing import Optional, Dict, Any
+from . import jsonio
 from .config import DATA_ROOT, ARCHIVE_ROOT
 
 class StorageManager:
@@ -23,6 +23,9 @@ class StorageManager:
         self.root_path = root_path
         self.root_path.mkdir(exist_ok=True)
         ARCHIVE_ROOT.mkdir(exist_ok=True)
+        # category -> (dir mtime_ns, doc names); adding or removing a doc
+        # bumps the directory mtime, so staleness is a single stat away
+        self._doc_list_cache: Dict[str, tuple] = {}
 
     def get_document_dir(self, category: str, doc_name: str) -> Path:
         return self.root_path / category / doc_name
@@ -44,24 +47,35 @@ class StorageManager:
 
     def save_metadata(self, category: str, doc_name: str, metadata: Dict[str, Any]):
         path = self.get_metadata_path(category, doc_name)
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(metadata, f, indent=2, ensure_ascii=False)
+        path.write_text(jsonio.dumps_pretty(metadata), encoding="utf-8")
 
     def load_metadata(self, category: str, doc_name: str) -> Optional[Dict[str, Any]]:
         path = self.get_metadata_path(category, doc_name)
         if path.exists():
-            with open(path, "r", encoding="utf-8") as f:
-                return json.load(f)
+            # One read_bytes syscall straight into the (orjson-backed) parser
+            return jsonio.loads(path.read_bytes())
         return None
 
     def list_categories(self) -> list[str]:
         return [d.name for d in self.root_path.iterdir() if d.is_dir()]
 
     def list_documents(self, category: str) -> list[str]:
+        import os
         cat_dir = self.root_path / category
-        if not cat_dir.exists():
+        try:
+            mtime = cat_dir.stat().st_mtime_ns
+        except OSError:
             return []
-        return [d.name for d in cat_dir.iterdir() if d.is_dir() and not d.name.startswith("_")]
+        cached = self._doc_list_cache.get(category)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        # scandir answers is_dir from the directory entry itself — no
+        # per-entry stat like iterdir's Path.is_dir
+        with os.scandir(cat_dir) as entries:
+            names = [e.name for e in entries
+                     if e.is_dir(follow_symlinks=False) and not e.name.startswith("_")]
+        self._doc_list_cache[category] = (mtime, names)
+        return names
 
     def delete_file(self, file_path: Path):
         if file_path.exists():
@@ -79,22 +93,67 @@ class StorageManager:
         if cat_dir.exists():
             shutil.rmtree(cat_dir)
 
+    def _archive_state_path(self) -> Path:
+        return ARCHIVE_ROOT / ".archive_state.json"
+
+    def _load_archive_state(self) -> Dict[str, Any]:
+        """'category/doc' -> {signature, archive} for the latest snapshot."""
+        try:
+            return jsonio.loads(self._archive_state_path().read_bytes())
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def _dir_signature(doc_dir: Path) -> Dict[str, list]:
+        """relative path -> [size, mtime_ns] for every file under doc_dir."""
+        import os
+        signature = {}
+        for dirpath, _dirnames, filenames in os.walk(doc_dir):
+            for name in filenames:
+                full = Path(dirpath) / name
+                st = full.stat()
+                signature[full.relative_to(doc_dir).as_posix()] = [st.st_size, st.st_mtime_ns]
+        return signature
+
     def archive_document(self, category: str, doc_name: str) -> str:
-        import shutil
+        import os
+        import zipfile
         from datetime import datetime
         doc_dir = self.get_document_dir(category, doc_name)
         if not doc_dir.exists():
             return ""
-        
+
+        # Archives must stay self-contained snapshots (restore unpacks one
+        # zip), but re-zipping identical bytes is the common case when a
+        # restore archives the current state right after an update. A
+        # size+mtime signature of the tree spots that case and reuses the
+        # previous snapshot instead of rebuilding it.
+        state = self._load_archive_state()
+        state_key = f"{category}/{doc_name}"
+        signature = self._dir_signature(doc_dir)
+        previous = state.get(state_key)
+        if previous and previous.get("signature") == signature \
+                and (ARCHIVE_ROOT / previous.get("archive", "")).exists():
+            return previous["archive"]
+
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         # Use double underscore for safer parsing
         # Sanitize components to stay within path limits
         s_cat = self.sanitize_component(category, 30)
         s_doc = self.sanitize_component(doc_name, 50)
         archive_name = f"{s_cat}__{s_doc}__{timestamp}"
-        archive_path = ARCHIVE_ROOT / archive_name
-        
-        shutil.make_archive(str(archive_path), 'zip', str(doc_dir))
+        archive_path = ARCHIVE_ROOT / f"{archive_name}.zip"
+
+        # Stored (uncompressed) entries: the bulk of a document tree is the
+        # original PDF/DOCX, which DEFLATE cannot shrink further — it only
+        # burns CPU. Plain zip keeps restore/unpack working unchanged.
+        with zipfile.ZipFile(archive_path, "w", compression=zipfile.ZIP_STORED) as zf:
+            for dirpath, _dirnames, filenames in os.walk(doc_dir):
+                for name in filenames:
+                    full = Path(dirpath) / name
+                    zf.write(full, arcname=full.relative_to(doc_dir).as_posix())
+        state[state_key] = {"signature": signature, "archive": f"{archive_name}.zip"}
+        self._archive_state_path().write_text(jsonio.dumps_pretty(state), encoding="utf-8")
         return f"{archive_name}.zip"
 
     def list_archives(self) -> list[str]: